@@ -0,0 +1,50 @@
+"""
+Analytics CLI over the Parquet report archive (see export_archive.py).
+
+Runs SQL with DuckDB against the views reports, verifications and media; the
+year/month columns come from the archive's directory layout and filtering on them
+skips whole files. Postgres is never touched.
+
+    python analytics.py "SELECT hazard_type, count(*) FROM reports WHERE year = 2026 GROUP BY 1"
+    python analytics.py --trends --interval quarter
+"""
+import argparse
+import asyncio
+
+from app.services.analytics_service import analytics_service, TREND_INTERVALS
+
+
+def print_table(columns, rows):
+    cells = [[str(value) for value in row] for row in rows]
+    widths = [max([len(column)] + [len(row[i]) for row in cells]) for i, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    print("  ".join("-" * width for width in widths))
+    for row in cells:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+    print(f"({len(rows)} rows)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the Parquet report archive.")
+    parser.add_argument("sql", nargs="?", help="SQL to run against reports, verifications and media")
+    parser.add_argument("--trends", action="store_true", help="Show report trends per period and hazard type")
+    parser.add_argument("--interval", default="month", choices=TREND_INTERVALS)
+    args = parser.parse_args()
+
+    tables = analytics_service.available_tables()
+    if not tables:
+        parser.error(f"No archive found in {analytics_service.archive_dir}; run export_archive.py first.")
+
+    if args.trends:
+        rows = asyncio.run(analytics_service.report_trends(args.interval))
+        columns = list(rows[0]) if rows else ["period", "hazard_type", "reports"]
+        print_table(columns, [list(row.values()) for row in rows])
+    elif args.sql:
+        result = analytics_service.run_query(args.sql)
+        print_table(result["columns"], result["rows"])
+    else:
+        parser.error("Give SQL to run or --trends.")
+
+
+if __name__ == "__main__":
+    main()
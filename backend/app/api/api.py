@@ -1,9 +1,13 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import reports, auth, verifications
+from app.api.endpoints import reports, auth, verifications, stream, metrics, uploads, analytics
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(reports.router, prefix="/reports", tags=["Reports"])
 api_router.include_router(verifications.router, prefix="/verifications", tags=["Verifications"])
+api_router.include_router(uploads.router, prefix="/uploads", tags=["Uploads"])
+api_router.include_router(stream.router, prefix="/stream", tags=["Stream"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
 
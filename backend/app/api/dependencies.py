@@ -1,38 +1,112 @@
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from jose import JWTError, jwt
+from jose import JWTError
+import math
 import uuid
+from typing import Optional
 
 from app.db.session import get_db
-from app.db.models import User
-from app.core.config import settings
+from app.db.models import User, UserRole
+from app.core.security import decode_token, ACCESS_TOKEN_TYPE
+from app.services.user_cache import CachedUser, user_cache
+from app.services.token_revocation import token_revocations
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+async def _access_token_claims(token: str, db: AsyncSession) -> dict:
+    """Decode an access token and reject it if it or its login session was revoked."""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    query = select(User).where(User.id == uuid.UUID(user_id))
-    result = await db.execute(query)
-    user = result.scalars().first()
-    
+        payload = decode_token(token, ACCESS_TOKEN_TYPE)
+        payload["sub"] = uuid.UUID(payload["sub"])
+    except (JWTError, ValueError):
+        raise _credentials_exception()
+
+    if await token_revocations.is_revoked(db, payload.get("jti"), payload.get("sid")):
+        raise _credentials_exception()
+    return payload
+
+async def _load_user(db: AsyncSession, user_id: uuid.UUID) -> CachedUser:
+    user = user_cache.get(user_id)
     if user is None:
-        raise credentials_exception
-        
+        query = select(User).where(User.id == user_id)
+        result = await db.execute(query)
+        row = result.scalars().first()
+
+        if row is None:
+            raise _credentials_exception()
+
+        user = CachedUser.from_model(row)
+        user_cache.put(user)
+    return user
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> CachedUser:
+    """The caller's full user record, from the user cache or the database."""
+    payload = await _access_token_claims(token, db)
+    user = await _load_user(db, payload["sub"])
+
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+
     return user
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller as described by their access token."""
+    id: uuid.UUID
+    role: UserRole
+    is_active: bool
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Authenticates from the access token's claims alone: no database access unless
+    the token's id is flagged by the revocation filter. For endpoints that only
+    need the caller's id and role. Tokens issued without role claims fall back to
+    loading the user.
+    """
+    payload = await _access_token_claims(token, db)
+    if "role" in payload and "active" in payload:
+        principal = Principal(id=payload["sub"], role=UserRole(payload["role"]), is_active=payload["active"])
+    else:
+        user = await _load_user(db, payload["sub"])
+        principal = Principal(id=user.id, role=user.role, is_active=user.is_active)
+
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+
+    return principal
+
+async def get_current_analyst(principal: Principal = Depends(get_current_principal)) -> Principal:
+    """Like get_current_principal, but only for analysts."""
+    if principal.role != UserRole.analyst:
+        raise HTTPException(status_code=403, detail="Analyst role required")
+    return principal
+
+def parse_bbox(bbox: Optional[str]) -> tuple:
+    """Parse a 'min_lng,min_lat,max_lng,max_lat' string into (min_lat, min_lng, max_lat, max_lng)."""
+    if bbox is None:
+        return (None, None, None, None)
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be 'min_lng,min_lat,max_lng,max_lat'.")
+    if not all(math.isfinite(v) for v in (min_lng, min_lat, max_lng, max_lat)):
+        raise HTTPException(status_code=400, detail="bbox coordinates must be finite numbers.")
+    if min_lat > max_lat or min_lng > max_lng:
+        raise HTTPException(status_code=400, detail="Bounding box minimums must not exceed maximums.")
+    return (max(min_lat, -90.0), max(min_lng, -180.0), min(max_lat, 90.0), min(max_lng, 180.0))
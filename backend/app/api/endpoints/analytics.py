@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional, List
+from datetime import datetime
+
+from app.db.models import HazardType, ReportStatus
+from app.services.analytics_service import analytics_service, TREND_INTERVALS
+from app.api.dependencies import get_current_analyst, Principal
+
+router = APIRouter()
+
+
+@router.get("/months", summary="List the months available in the report archive")
+async def list_archived_months(current_user: Principal = Depends(get_current_analyst)):
+    """Months exported to the Parquet archive, oldest first. Analysts only."""
+    return {"months": await analytics_service.archived_months()}
+
+
+@router.get("/trends", summary="Report trends from the archive")
+async def get_report_trends(
+    interval: str = Query("month", description=f"One of: {', '.join(TREND_INTERVALS)}"),
+    since: Optional[datetime] = Query(None, description="Only reports created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only reports created before this time"),
+    hazard_type: List[HazardType] = Query([], description="Only these hazard types"),
+    status: List[ReportStatus] = Query([], description="Only these report statuses"),
+    current_user: Principal = Depends(get_current_analyst)
+):
+    """Return report counts, verified/rejected counts and mean confidence per period and hazard type.
+    Computed from the Parquet archive, so it covers exported (closed) months only and
+    never queries the live database. Analysts only.
+    """
+    if interval not in TREND_INTERVALS:
+        raise HTTPException(status_code=400, detail=f"interval must be one of: {', '.join(TREND_INTERVALS)}")
+    if since is not None and until is not None and since > until:
+        raise HTTPException(status_code=400, detail="since must not be later than until.")
+
+    rows = await analytics_service.report_trends(
+        interval, since, until, [h.name for h in hazard_type], [s.name for s in status]
+    )
+    items = []
+    for row in rows:
+        hazard = row["hazard_type"]
+        items.append({
+            "period": row["period"].isoformat() if row["period"] else None,
+            "hazard_type": HazardType[hazard].value if hazard in HazardType.__members__ else hazard,
+            "reports": row["reports"],
+            "verified": row["verified"],
+            "rejected": row["rejected"],
+            "avg_confidence": row["avg_confidence"]
+        })
+    return {"items": items, "count": len(items)}
@@ -1,16 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from datetime import datetime, timedelta, timezone
+from jose import JWTError
+from typing import Optional
 import uuid
 
-from app.models.pydantic_models import UserCreate, UserRead, Token
+from app.models.pydantic_models import UserCreate, UserRead, Token, RefreshRequest
 from app.db.models import User
 from app.db.session import get_db
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.config import settings
+from app.core.security import (
+    hash_password_async, verify_password_async, create_token_pair, decode_token,
+    ACCESS_TOKEN_TYPE, REFRESH_TOKEN_TYPE
+)
+from app.api.dependencies import oauth2_scheme
+from app.services.token_revocation import token_revocations
 
 router = APIRouter()
 
+# /refresh also takes the refresh token as a bearer token, which is what the mobile app sends
+optional_bearer = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_in: UserCreate, db: AsyncSession = Depends(get_db)
@@ -24,7 +36,7 @@ async def register_user(
             detail="An account with this email already exists.",
         )
 
-    hashed_password = hash_password(user_in.password)
+    hashed_password = await hash_password_async(user_in.password)
     user_data = user_in.model_dump(exclude={"password"})
     
     new_user = User(
@@ -53,7 +65,10 @@ async def login_for_access_token(
     result = await db.execute(query)
     user = result.scalars().first()
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = (
+        await verify_password_async(form_data.password, user.hashed_password) if user else (False, None)
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -63,6 +78,83 @@ async def login_for_access_token(
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
 
-    access_token = create_access_token(data={"sub": str(user.id)})
-    
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    if new_hash:
+        # Transparently move the stored hash to the configured bcrypt cost
+        user.hashed_password = new_hash
+        await db.commit()
+
+    return create_token_pair(user)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    request: Optional[RefreshRequest] = None,
+    bearer_token: Optional[str] = Depends(optional_bearer),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Exchanges a refresh token for a new access token and a new refresh token.
+    Each refresh token works once: presenting one that was already exchanged is
+    treated as theft and ends the whole login session, unless it was exchanged
+    less than REFRESH_REUSE_GRACE_SECONDS ago (concurrent refreshes from two tabs,
+    or a retry after a lost response), in which case it is exchanged again.
+    """
+    invalid_refresh = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    token = request.refresh_token if request else bearer_token
+    if not token:
+        raise invalid_refresh
+    try:
+        payload = decode_token(token, REFRESH_TOKEN_TYPE)
+        user_id = uuid.UUID(payload["sub"])
+        token_id, session_id = payload["jti"], payload["sid"]
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise invalid_refresh
+
+    if await token_revocations.is_revoked(db, token_id, session_id):
+        if await token_revocations.is_revoked(db, session_id):
+            raise invalid_refresh
+        rotated_at = await token_revocations.revoked_at(db, token_id)
+        grace = timedelta(seconds=settings.REFRESH_REUSE_GRACE_SECONDS)
+        if rotated_at is None or datetime.now(timezone.utc) - rotated_at > grace:
+            session_expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+            await token_revocations.revoke(db, [session_id], session_expires_at)
+            raise invalid_refresh
+
+    # Role and active status are re-read so the new access token carries current claims
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
+    if user is None or not user.is_active:
+        raise invalid_refresh
+
+    await token_revocations.revoke(db, [token_id], datetime.fromtimestamp(payload["exp"], tz=timezone.utc))
+    return create_token_pair(user, session_id)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Ends the login session of the presented access token: the token and every
+    refresh token of the session stop working within TOKEN_REVOCATION_SYNC_SECONDS
+    on all API processes. Expired access tokens are accepted.
+    """
+    try:
+        payload = decode_token(token, ACCESS_TOKEN_TYPE, verify_exp=False)
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # The session id outlives the access token: it must also cover the session's refresh tokens
+    session_expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    token_ids = [token_id for token_id in (payload.get("jti"), payload.get("sid")) if token_id]
+    await token_revocations.revoke(db, token_ids, session_expires_at)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+
+from app.services.metrics import metrics
+
+router = APIRouter()
+
+@router.get("", summary="Get process metrics", description="Latency histograms and counters for this API process.")
+async def get_metrics():
+    """
+    Returns a JSON snapshot of every metric registered in this process.
+    Each API worker process keeps its own metrics.
+    """
+    return metrics.snapshot()
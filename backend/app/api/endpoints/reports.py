@@ -1,52 +1,335 @@
-from fastapi import APIRouter, Form, UploadFile, File, HTTPException, Depends, Header
-from typing import Optional, List
+from fastapi import APIRouter, Form, UploadFile, File, HTTPException, Depends, Header, Query, Request, Response
+from typing import Optional, List, Callable, Awaitable, Tuple, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func
+from sqlalchemy import func, cast, case, literal_column, tuple_, true, String
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
+import time
 import uuid
 
-from app.db.models import User, HazardType, Report, Media
-from app.db.session import get_db
-from app.models.pydantic_models import ReportSubmitResponse
+from app.db.models import (
+    HazardType, ReportStatus, Report, Media, report_point, HOTSPOT_CONFIDENCE_THRESHOLD
+)
+from app.db.session import get_db, get_read_db, replica_staleness
+from app.core.config import settings
+from app.models.pydantic_models import (
+    ReportSubmitResponse, MediaPresignRequest, MediaPresignResponse,
+    ReportBatchSubmitRequest, ReportBatchSubmitResponse
+)
 from app.services.rabbitmq_service import rabbitmq_service
-from app.services.s3_service import s3_service
-from app.api.dependencies import get_current_user
+from app.services.s3_service import s3_service, media_type_for_content_type
+from app.services.media_blob_service import media_blob_service
+from app.services.admission_control import admission_controller, REPORT_QUEUE
+from app.services.hotspot_cache import hotspot_cache
+from app.services.metrics import metrics
+from app.services.tile_cache import tile_cache, TILE_EXTENT, TILE_BUFFER, MAX_TILE_ZOOM
+from app.api.dependencies import get_current_principal, Principal, parse_bbox
 
 router = APIRouter()
 
-@router.post("/submit", response_model=ReportSubmitResponse, status_code=202, summary="Submit a new Hazard Report")
-async def submit_hazard_report(
-    latitude: float = Header(..., description="Auto-detected latitude from device GPS"),
-    longitude: float = Header(..., description="Auto-detected longitude from device GPS"),
-    user_hazard_type: HazardType = Form(..., description="The type of hazard observed"),
-    user_description: Optional[str] = Form(None, description="A description of the hazard"),
-    media_files: List[UploadFile] = File([], description="Optional list of image, video, or audio files"),
-    current_user: User = Depends(get_current_user)
+submit_latency = metrics.histogram("report_submit_seconds", "Time to accept a report on /api/reports/submit")
+submit_batch_latency = metrics.histogram(
+    "report_submit_batch_seconds", "Time to accept a batch on /api/reports/submit-batch"
+)
+
+MAX_HOTSPOT_LIMIT = 5000
+MAX_RECENT_LIMIT = 100
+# Delta feed page size, and how long a change must be committed before it is handed out
+DELTA_PAGE_SIZE = 1000
+DELTA_SETTLE_SECONDS = 2
+CURSOR_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Grid cells per 256px map tile edge when clustering, and a hard cap on cells returned
+CLUSTER_CELLS_PER_TILE = 4
+MAX_CLUSTER_CELLS = 500
+# Half the width of the web-mercator world, in meters
+MERCATOR_HALF_WORLD = 20037508.342789244
+
+
+def _viewport_clauses(min_lat: Optional[float], min_lng: Optional[float],
+                      max_lat: Optional[float], max_lng: Optional[float]) -> list:
+    """Build WHERE clauses restricting reports to a bounding box (empty if no box given)."""
+    bbox = (min_lat, min_lng, max_lat, max_lng)
+    if all(v is None for v in bbox):
+        return []
+    if any(v is None for v in bbox):
+        raise HTTPException(
+            status_code=400,
+            detail="min_lat, min_lng, max_lat and max_lng must be provided together."
+        )
+    if min_lat > max_lat or min_lng > max_lng:
+        raise HTTPException(status_code=400, detail="Bounding box minimums must not exceed maximums.")
+
+    # ST_Intersects does an index-assisted '&&' on the user_location GIST index first
+    envelope = func.ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326)
+    return [func.ST_Intersects(report_point, envelope)]
+
+
+def _hotspot_filter_clauses(
+    since: Optional[datetime], until: Optional[datetime], hazard_type: List[HazardType],
+    status: List[ReportStatus], min_confidence: float, active_since: Optional[datetime] = None
+) -> list:
+    """
+    Build WHERE clauses for the time window, hazard type, status and confidence filters.
+    active_since (see _active_since) is an extra lower bound on top of since.
+    """
+    if since is not None and until is not None and since > until:
+        raise HTTPException(status_code=400, detail="since must not be later than until.")
+
+    clauses = [Report.final_confidence_score >= min_confidence]
+    if since is not None:
+        clauses.append(Report.created_at >= since)
+    if active_since is not None:
+        clauses.append(Report.created_at >= active_since)
+    if until is not None:
+        clauses.append(Report.created_at < until)
+    elif since is not None or active_since is not None:
+        # Bound the window above as well, so the planner also skips the premade future
+        # partitions; this is the clock that stamps created_at
+        clauses.append(Report.created_at <= func.timezone('utc', func.now()))
+    if hazard_type:
+        clauses.append(Report.user_hazard_type.in_(hazard_type))
+    if status:
+        clauses.append(Report.status.in_(status))
+    return clauses
+
+
+def _active_since() -> datetime:
+    """Start of the active window of hotspot queries: HOTSPOT_ACTIVE_DAYS days ago, from midnight UTC."""
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=settings.HOTSPOT_ACTIVE_DAYS)
+
+
+def _hotspot_item(rid, conf, status, hazard, created_at, lat, lng) -> dict:
+    return {
+        "report_id": str(rid),
+        "latitude": lat,
+        "longitude": lng,
+        "confidence": float(conf or 0.0),
+        "status": status.value if hasattr(status, 'value') else str(status),
+        "hazard_type": hazard.value if hasattr(hazard, 'value') else str(hazard),
+        "created_at": created_at.isoformat() if created_at else None
+    }
+
+
+def _encode_cursor(timestamp: datetime, row_id: uuid.UUID) -> str:
+    """Opaque, URL-safe keyset cursor: a timestamp in microseconds since the epoch and a row id."""
+    return f"{(timestamp - CURSOR_EPOCH) // timedelta(microseconds=1)}_{row_id}"
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        micros, row_id = cursor.split("_")
+        return CURSOR_EPOCH + timedelta(microseconds=int(micros)), uuid.UUID(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+async def _cached_json_response(
+    cache_key: tuple, load: Callable[[AsyncSession], Awaitable[dict]], if_none_match: Optional[str]
+) -> Response:
+    """
+    Serve a JSON payload through the hotspot cache, answering 304 when the client's ETag
+    matches. load(db) runs in a read session opened by the cache.
+    """
+    body, etag = await hotspot_cache.get_or_compute(cache_key, load)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if if_none_match:
+        client_tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if etag in client_tags or "*" in client_tags:
+            return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.post("/media/presign", response_model=MediaPresignResponse, summary="Get presigned URLs for direct media upload")
+async def presign_media_uploads(
+    request: MediaPresignRequest,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
-    report_id = uuid4()
-
-    media_payloads = []
-    for file in media_files:
-        content_type = file.content_type
-        if content_type.startswith("image/"): media_type = "image"
-        elif content_type.startswith("video/"): media_type = "video"
-        elif content_type.startswith("audio/"): media_type = "audio"
-        else: continue
-            
-        # Call the S3 service to upload the file and get a REAL URL
-        real_file_url = s3_service.upload_file(file, media_type, report_id)
-        
-        # We only add the file to the message if the upload was successful
-        if real_file_url:
-            media_payloads.append({
-                "file_url": real_file_url,
-                "media_type": media_type
-            })
-    
-    message_body = {
+    """
+    Step one of the direct upload flow: returns a report_id and one presigned PUT per file.
+    The client uploads each file straight to object storage, then calls /submit with the
+    same report_id and the returned keys as media_keys.
+    Files sent with a sha256 of content this user has already stored come back with
+    existing=true and the stored object's key, and need no upload.
+    """
+    report_id = request.report_id or uuid4()
+    # Only the user's own stored content can be reused by naming its hash
+    known = await media_blob_service.find_by_hashes(
+        db, [f.sha256 for f in request.files if f.sha256], owner_id=current_user.id
+    )
+
+    uploads = []
+    for file in request.files:
+        media_type = media_type_for_content_type(file.content_type)
+        if media_type is None:
+            raise HTTPException(status_code=400, detail=f"Unsupported media type: {file.content_type}")
+        if file.sha256 in known:
+            uploads.append({"key": known[file.sha256].s3_key, "media_type": media_type, "existing": True})
+            continue
+        key = s3_service.build_key(media_type, current_user.id, report_id, file.filename)
+        uploads.append({
+            "key": key, "media_type": media_type,
+            **s3_service.presign_upload(key, file.content_type, file.sha256)
+        })
+
+    return {"report_id": report_id, "uploads": uploads}
+
+
+@router.put("/media/stream", summary="Stream one media file straight into object storage")
+async def stream_media_upload(
+    request: Request,
+    report_id: uuid.UUID = Header(..., alias="X-Report-Id", description="report_id the media belongs to"),
+    filename: Optional[str] = Header(None, alias="X-Filename", description="Original file name"),
+    content_type: str = Header(..., description="MIME type of the media"),
+    content_length: Optional[int] = Header(None, description="Exact size of the body in bytes"),
+    content_sha256: Optional[str] = Header(
+        None, alias="X-Content-SHA256", description="Hex SHA-256 of the body, to skip uploading known content"
+    ),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Memory-bounded alternative to multipart media_files for large videos: the raw request
+    body is sent to an S3 multipart upload as it arrives, with only one part buffered.
+    Oversized media is rejected from Content-Length before any of the body is read.
+    Returns the object key to pass to /submit as media_keys (with the same report_id).
+    The key is stored under the caller's user id, so X-Report-Id cannot reach another
+    user's media.
+
+    Content that is already stored is not stored again: the existing key is returned,
+    without reading the body if X-Content-SHA256 names content the caller uploaded before.
+    """
+    media_type = media_type_for_content_type(content_type)
+    if media_type is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported media type: {content_type}")
+    if content_length is None:
+        raise HTTPException(status_code=411, detail="Content-Length is required.")
+    if content_length > settings.MAX_MEDIA_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Media larger than {settings.MAX_MEDIA_UPLOAD_BYTES} bytes is not accepted."
+        )
+
+    if content_sha256:
+        known = await media_blob_service.find_by_hashes(db, [content_sha256.lower()], owner_id=current_user.id)
+        if known:
+            blob = known[content_sha256.lower()]
+            return {
+                "report_id": report_id, "key": blob.s3_key, "media_type": media_type,
+                "size": blob.size_bytes, "content_hash": blob.content_hash, "duplicate": True
+            }
+
+    key = s3_service.build_key(media_type, current_user.id, report_id, filename)
+    size, content_hash, stored = await s3_service.stream_upload(
+        request.stream(), key, content_type, content_length,
+        is_known=lambda h: media_blob_service.is_known(db, h)
+    )
+    if not stored:
+        # The body was received in full, so the caller has the content and may reuse it
+        blob = (await media_blob_service.find_by_hashes(db, [content_hash]))[content_hash]
+        await media_blob_service.add_owner(db, [content_hash], current_user.id)
+        return {
+            "report_id": report_id, "key": blob.s3_key, "media_type": media_type,
+            "size": size, "content_hash": content_hash, "duplicate": True
+        }
+
+    await media_blob_service.register(db, [{
+        "content_hash": content_hash, "s3_key": key, "file_url": s3_service.object_url(key),
+        "media_type": media_type, "size_bytes": size
+    }], current_user.id)
+    return {
+        "report_id": report_id, "key": key, "media_type": media_type,
+        "size": size, "content_hash": content_hash, "duplicate": False
+    }
+
+
+async def _uploaded_media_payloads_many(
+    db: AsyncSession, user_id: uuid.UUID, reports: List[Tuple[uuid.UUID, List[str]]]
+) -> List[Union[List[dict], str]]:
+    """
+    Validate client-uploaded object keys for several of a user's reports and build their
+    media payloads. A key must either be one of the report's own uploads by this user
+    (see S3Service.build_key) or an already stored blob this user has uploaded
+    (handed out for known content); only keys not in the blob registry are HEADed,
+    all in parallel. Returns per report its payloads, or why its media was rejected.
+    """
+    blobs = await media_blob_service.find_by_keys(db, [key for _, keys in reports for key in keys], owner_id=user_id)
+
+    errors = {}
+    media_types = {}
+    own_keys = set()
+    for index, (report_id, keys) in enumerate(reports):
+        for key in keys:
+            media_type = s3_service.own_key_media_type(key, user_id, report_id)
+            own_key = media_type is not None
+            if key not in blobs and not own_key:
+                errors.setdefault(index, f"Media key {key} does not belong to report {report_id}.")
+                continue
+            media_types[key] = media_type or blobs[key].media_type.value
+            if own_key:
+                own_keys.add((report_id, key))
+
+    unknown_keys = list(dict.fromkeys(
+        key for index, (_, keys) in enumerate(reports) if index not in errors for key in keys if key not in blobs
+    ))
+    heads = dict(zip(unknown_keys, await s3_service.head_objects(unknown_keys)))
+    for index, (_, keys) in enumerate(reports):
+        missing = [key for key in keys if key in heads and heads[key] is None]
+        if index not in errors and missing:
+            errors[index] = f"Media not uploaded: {', '.join(missing)}"
+
+    # Presigned uploads made with a sha256 carry a checksum verified by the store; register them for reuse
+    await media_blob_service.register(db, list({
+        head["content_hash"]: {
+            "content_hash": head["content_hash"], "s3_key": key, "file_url": s3_service.object_url(key),
+            "media_type": media_types[key], "size_bytes": head["size"]
+        }
+        for key, head in heads.items() if head and head["content_hash"]
+    }.values()), user_id)
+
+    results = []
+    for index, (report_id, keys) in enumerate(reports):
+        if index in errors:
+            results.append(errors[index])
+            continue
+        payloads = []
+        for key in keys:
+            if key in blobs:
+                payloads.append(media_blob_service.media_payload(
+                    blobs[key].file_url, media_types[key], blobs[key].content_hash, (report_id, key) not in own_keys
+                ))
+            else:
+                payloads.append(media_blob_service.media_payload(
+                    s3_service.object_url(key), media_types[key], heads[key]["content_hash"], False
+                ))
+        results.append(payloads)
+    return results
+
+
+async def _uploaded_media_payloads(
+    db: AsyncSession, user_id: uuid.UUID, report_id: uuid.UUID, media_keys: List[str]
+) -> List[dict]:
+    """Validate client-uploaded object keys for one of a user's reports and build their media payloads."""
+    result = (await _uploaded_media_payloads_many(db, user_id, [(report_id, media_keys)]))[0]
+    if isinstance(result, str):
+        raise HTTPException(status_code=400, detail=result)
+    return result
+
+
+def _report_message(
+    report_id: uuid.UUID, user_id: uuid.UUID, user_hazard_type: HazardType, user_description: Optional[str],
+    latitude: float, longitude: float, media_payloads: List[dict]
+) -> dict:
+    """Body of a report_processing_queue message for the coordinator worker."""
+    return {
         "report_id": str(report_id),
-        "user_id": str(current_user.id),
+        "user_id": str(user_id),
+        # Becomes the report's created_at, so a redelivered message maps to the same row
+        "submitted_at": datetime.now(timezone.utc).isoformat(),
         "report_data": {
             "user_hazard_type": user_hazard_type.value,
             "user_description": user_description,
@@ -56,99 +339,411 @@ async def submit_hazard_report(
         "media_files": media_payloads # This now contains REAL S3 URLs
     }
 
+
+@router.post("/submit", response_model=ReportSubmitResponse, status_code=202, summary="Submit a new Hazard Report")
+async def submit_hazard_report(
+    latitude: float = Header(..., description="Auto-detected latitude from device GPS"),
+    longitude: float = Header(..., description="Auto-detected longitude from device GPS"),
+    user_hazard_type: HazardType = Form(..., description="The type of hazard observed"),
+    user_description: Optional[str] = Form(None, description="A description of the hazard"),
+    media_files: List[UploadFile] = File([], description="Optional list of image, video, or audio files"),
+    report_id: Optional[uuid.UUID] = Form(None, description="report_id from /media/presign when using media_keys"),
+    media_keys: List[str] = Form([], description="Object keys uploaded via /media/presign presigned URLs"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    start = time.perf_counter()
+    try:
+        if media_keys and report_id is None:
+            raise HTTPException(status_code=400, detail="report_id is required with media_keys.")
+        report_id = report_id or uuid4()
+
+        # Refuse or deprioritize before doing any storage work
+        queue_name = await admission_controller.admit(current_user.id)
+
+        # Media uploaded directly to object storage only needs an existence check
+        media_payloads = await _uploaded_media_payloads(db, current_user.id, report_id, media_keys) if media_keys else []
+
+        uploads = []
+        for file in media_files:
+            media_type = media_type_for_content_type(file.content_type)
+            if media_type is None:
+                continue
+            uploads.append((file, media_type))
+
+        # Upload new content in parallel off the event loop; known content reuses its stored object
+        media_payloads += await media_blob_service.store_uploads(db, uploads, current_user.id, report_id)
+    
+        message_body = _report_message(
+            report_id, current_user.id, user_hazard_type, user_description, latitude, longitude, media_payloads
+        )
+
+        try:
+            await rabbitmq_service.publish_message(queue_name, message_body)
+        except Exception as e:
+            print(f"Error queueing report {report_id}: {e}")
+            raise HTTPException(status_code=500, detail="Could not queue report for processing.")
+
+        if queue_name != REPORT_QUEUE:
+            return {
+                "message": "Hazard report has been accepted with low priority; processing may be delayed.",
+                "report_id": report_id,
+                "priority": "low"
+            }
+        return {"message": "Hazard report has been accepted for processing.", "report_id": report_id}
+    finally:
+        # Refused and failed submissions count too
+        submit_latency.observe(time.perf_counter() - start)
+
+
+@router.post(
+    "/submit-batch", response_model=ReportBatchSubmitResponse, status_code=202,
+    summary="Submit several queued Hazard Reports at once"
+)
+async def submit_hazard_report_batch(
+    request: ReportBatchSubmitRequest,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Accepts reports an offline client queued up, with media already uploaded through
+    /media/presign, /media/stream or /api/uploads and referenced by media_keys.
+    All media is checked in parallel and all reports are queued with one round of
+    publisher confirms. Each report gets its own result; report_ids that were already
+    accepted come back as 'duplicate', so a batch can be re-sent safely.
+    The batch is admitted as a whole, costing one rate-limit token per new report.
+    """
+    start = time.perf_counter()
     try:
-        await rabbitmq_service.publish_message("report_processing_queue", message_body)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Could not queue report for processing.")
+        items = request.reports
+        results = [{"report_id": item.report_id, "status": "accepted", "detail": None} for item in items]
+
+        existing = dict((await db.execute(
+            select(Report.id, Report.user_id).where(Report.id.in_([item.report_id for item in items]))
+        )).all())
+        seen = set()
+        pending = []
+        for index, item in enumerate(items):
+            if item.report_id in existing and existing[item.report_id] != current_user.id:
+                results[index].update(status="rejected", detail="report_id is already used by another report.")
+            elif item.report_id in existing:
+                results[index]["status"] = "duplicate"
+            elif item.report_id in seen:
+                results[index].update(status="rejected", detail="report_id appears more than once in the batch.")
+            else:
+                seen.add(item.report_id)
+                pending.append(index)
+
+        queue_name = await admission_controller.admit(current_user.id, len(pending)) if pending else REPORT_QUEUE
+
+        media = await _uploaded_media_payloads_many(
+            db, current_user.id, [(items[i].report_id, items[i].media_keys) for i in pending]
+        )
+        messages = []
+        for index, media_payloads in zip(pending, media):
+            if isinstance(media_payloads, str):
+                results[index].update(status="rejected", detail=media_payloads)
+                continue
+            item = items[index]
+            messages.append((index, _report_message(
+                item.report_id, current_user.id, item.user_hazard_type, item.user_description,
+                item.latitude, item.longitude, media_payloads
+            )))
+
+        if messages:
+            try:
+                errors = await rabbitmq_service.publish_messages(
+                    queue_name, [message for _, message in messages]
+                )
+            except Exception as e:
+                print(f"Error queueing a batch of {len(messages)} reports: {e}")
+                raise HTTPException(status_code=500, detail="Could not queue reports for processing.")
+            for (index, _), error in zip(messages, errors):
+                if error is not None:
+                    print(f"Error queueing report {items[index].report_id}: {error}")
+                    results[index].update(status="failed", detail="Could not queue report for processing.")
 
-    return {"message": "Hazard report has been accepted for processing.", "report_id": report_id}
+        return {"results": results, "priority": "normal" if queue_name == REPORT_QUEUE else "low"}
+    finally:
+        submit_batch_latency.observe(time.perf_counter() - start)
 
 
 @router.get("/hotspots", summary="List report hotspots with coordinates and confidence")
-async def list_hotspots(db: AsyncSession = Depends(get_db)):
+async def list_hotspots(
+    min_lat: Optional[float] = Query(None, ge=-90, le=90, description="South edge of the viewport"),
+    min_lng: Optional[float] = Query(None, ge=-180, le=180, description="West edge of the viewport"),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90, description="North edge of the viewport"),
+    max_lng: Optional[float] = Query(None, ge=-180, le=180, description="East edge of the viewport"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_HOTSPOT_LIMIT, description="Maximum number of hotspots to return"),
+    since: Optional[datetime] = Query(None, description="Only reports created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only reports created before this time"),
+    active: bool = Query(False, description="Only reports of the last HOTSPOT_ACTIVE_DAYS days"),
+    hazard_type: List[HazardType] = Query([], description="Only these hazard types"),
+    status: List[ReportStatus] = Query([], description="Only these report statuses"),
+    min_confidence: float = Query(HOTSPOT_CONFIDENCE_THRESHOLD, ge=0.0, le=1.0, description="Minimum confidence score"),
+    if_none_match: Optional[str] = Header(None)
+):
     """Return an array of hotspots with latitude, longitude, and final_confidence_score.
-    If score is null, default to 0.0. Only includes reports that have a location.
+    Only reports at or above min_confidence (the hotspot threshold by default) are included;
+    with active=true only those of the last HOTSPOT_ACTIVE_DAYS days, which reads just the
+    newest monthly partitions.
+    When a bounding box is given, only reports inside the viewport are returned, and
+    since/until, hazard_type and status narrow the result further, all in one SQL query.
+    Responses are served from the hotspot cache and carry an ETag.
+    """
+    active_since = _active_since() if active else None
+    query = select(
+        Report.id,
+        Report.final_confidence_score,
+        Report.status,
+        Report.user_hazard_type,
+        Report.created_at,
+        func.ST_Y(report_point),
+        func.ST_X(report_point)
+    ).where(
+        *_hotspot_filter_clauses(since, until, hazard_type, status, min_confidence, active_since),
+        *_viewport_clauses(min_lat, min_lng, max_lat, max_lng)
+    )
+
+    if limit is not None:
+        query = query.order_by(Report.final_confidence_score.desc()).limit(limit)
+
+    async def load_hotspots(db: AsyncSession) -> dict:
+        result = await db.execute(query)
+
+        hotspots = [_hotspot_item(*row) for row in result.all()]
+
+        return {"items": hotspots, "count": len(hotspots)}
+
+    cache_key = (
+        "hotspots", min_lat, min_lng, max_lat, max_lng, limit, since, until, active_since,
+        frozenset(hazard_type), frozenset(status), min_confidence
+    )
+    return await _cached_json_response(cache_key, load_hotspots, if_none_match)
+
+
+@router.get("/hotspots/changes", summary="List hotspot changes since a cursor")
+async def list_hotspot_changes(
+    since: Optional[str] = Query(None, description="next_cursor from a previous response; omit for an initial sync"),
+    limit: int = Query(DELTA_PAGE_SIZE, ge=1, le=DELTA_PAGE_SIZE, description="Maximum number of changes to return"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Return reports inserted, re-scored or re-statused after the cursor, oldest change first.
+    Reports now below the hotspot confidence threshold are returned as tombstones in 'deleted'.
+    Keep calling with next_cursor while has_more is true.
     """
-    # Extract WKT and parse without requiring Shapely
-    result = await db.execute(
+    # Changes younger than the settle window are held back, so a transaction still in
+    # flight cannot commit a row behind a cursor that was already handed out. On the
+    # replica the window also covers changes not yet replayed.
+    settle_seconds = DELTA_SETTLE_SECONDS + replica_staleness(db)
+    settled_before = func.timezone('utc', func.now()) - timedelta(seconds=settle_seconds)
+
+    query = select(
+        Report.id,
+        Report.final_confidence_score,
+        Report.status,
+        Report.user_hazard_type,
+        Report.created_at,
+        func.ST_Y(report_point),
+        func.ST_X(report_point),
+        Report.updated_at
+    ).where(Report.updated_at <= settled_before)
+
+    if since is not None:
+        query = query.where(tuple_(Report.updated_at, Report.id) > tuple_(*_decode_cursor(since)))
+    else:
+        # Initial sync: nothing to delete on the client yet
+        query = query.where(Report.final_confidence_score >= HOTSPOT_CONFIDENCE_THRESHOLD)
+
+    result = await db.execute(query.order_by(Report.updated_at, Report.id).limit(limit + 1))
+    rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items: List[dict] = []
+    deleted: List[str] = []
+    for (*hotspot, _) in rows:
+        conf = hotspot[1]
+        if conf is not None and conf >= HOTSPOT_CONFIDENCE_THRESHOLD:
+            items.append(_hotspot_item(*hotspot))
+        else:
+            deleted.append(str(hotspot[0]))
+
+    next_cursor = _encode_cursor(rows[-1][-1], rows[-1][0]) if rows else since
+    return {"items": items, "deleted": deleted, "next_cursor": next_cursor, "has_more": has_more}
+
+
+@router.get("/hotspots/clusters", summary="List hotspot clusters for a map zoom level")
+async def list_hotspot_clusters(
+    zoom: int = Query(..., ge=0, le=22, description="Map zoom level"),
+    bbox: Optional[str] = Query(None, description="Viewport as 'min_lng,min_lat,max_lng,max_lat'"),
+    since: Optional[datetime] = Query(None, description="Only reports created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only reports created before this time"),
+    active: bool = Query(False, description="Only reports of the last HOTSPOT_ACTIVE_DAYS days"),
+    hazard_type: List[HazardType] = Query([], description="Only these hazard types"),
+    status: List[ReportStatus] = Query([], description="Only these report statuses"),
+    min_confidence: float = Query(HOTSPOT_CONFIDENCE_THRESHOLD, ge=0.0, le=1.0, description="Minimum confidence score"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Group hotspots into grid cells sized for the zoom level.
+    Each cluster has its count, centroid, max/avg confidence and dominant hazard type.
+    At most MAX_CLUSTER_CELLS of the largest clusters are returned; truncated is true
+    when smaller ones were left out (zoom in or narrow the bbox to see them).
+    Accepts the same time, active, hazard type, status and confidence filters as /hotspots.
+    Responses are served from the hotspot cache and carry an ETag.
+    """
+    active_since = _active_since() if active else None
+    # A 256px tile spans 360 / 2^zoom degrees of longitude
+    cell_size = 360.0 / (2 ** zoom) / CLUSTER_CELLS_PER_TILE
+    cell = func.ST_SnapToGrid(report_point, cell_size)
+    viewport = parse_bbox(bbox)
+
+    query = (
         select(
-            Report.id,
-            Report.final_confidence_score,
-            Report.status,
-            Report.user_hazard_type,
-            Report.created_at,
-            func.ST_AsText(Report.user_location)
+            func.count(Report.id),
+            func.avg(func.ST_Y(report_point)),
+            func.avg(func.ST_X(report_point)),
+            func.max(Report.final_confidence_score),
+            func.avg(Report.final_confidence_score),
+            func.mode().within_group(Report.user_hazard_type)
+        )
+        .where(
+            *_hotspot_filter_clauses(since, until, hazard_type, status, min_confidence, active_since),
+            *_viewport_clauses(*viewport)
         )
+        .group_by(cell)
+        .order_by(func.count(Report.id).desc())
+        # One extra row tells whether cells were dropped
+        .limit(MAX_CLUSTER_CELLS + 1)
     )
-    rows = result.all()
 
-    hotspots: List[dict] = []
-    for (rid, conf, status, hazard, created_at, wkt) in rows:
-        if not wkt:
-            continue
-        # Normalize values
-        conf_val = float(conf or 0.0)
-        status_str = status.value if hasattr(status, 'value') else str(status)
-        # Reject only when confidence below threshold (0.35)
-        if conf_val < 0.35:
-            continue
-        # WKT format: 'POINT(lon lat)'
-        try:
-            coords = wkt.strip().replace("POINT(", "").replace(")", "").split()
-            if len(coords) != 2:
-                continue
-            lng = float(coords[0])
-            lat = float(coords[1])
-        except Exception:
-            continue
-        hotspots.append({
-            "report_id": str(rid),
-            "latitude": lat,
-            "longitude": lng,
-            "confidence": conf_val,
-            "status": status_str,
-            "hazard_type": hazard.value if hasattr(hazard, 'value') else str(hazard),
-            "created_at": created_at.isoformat() if created_at else None
-        })
+    async def load_clusters(db: AsyncSession) -> dict:
+        result = await db.execute(query)
+        rows = result.all()
+
+        clusters: List[dict] = []
+        for (count, lat, lng, max_conf, avg_conf, hazard) in rows[:MAX_CLUSTER_CELLS]:
+            clusters.append({
+                "count": count,
+                "latitude": lat,
+                "longitude": lng,
+                "max_confidence": float(max_conf),
+                "avg_confidence": float(avg_conf),
+                "dominant_hazard_type": hazard.value if hasattr(hazard, 'value') else str(hazard)
+            })
+
+        return {
+            "items": clusters,
+            "count": len(clusters),
+            "cell_size_degrees": cell_size,
+            "truncated": len(rows) > MAX_CLUSTER_CELLS
+        }
+
+    cache_key = (
+        "clusters", zoom, *viewport, since, until, active_since,
+        frozenset(hazard_type), frozenset(status), min_confidence
+    )
+    return await _cached_json_response(cache_key, load_clusters, if_none_match)
 
-    return {"items": hotspots, "count": len(hotspots)}
+
+@router.get("/tiles/{z}/{x}/{y}.pbf", summary="Get a Mapbox Vector Tile of reports")
+async def get_report_tile(z: int, x: int, y: int, db: AsyncSession = Depends(get_db)):
+    """Return the 'reports' vector tile layer for z/x/y with hazard type, status and confidence.
+    Tiles are served from the on-disk tile cache when present. Tiles are generated on
+    the primary: a cached tile is only dropped when a report event arrives, so one built
+    from a lagging replica could hide the change indefinitely.
+    """
+    if not 0 <= z <= MAX_TILE_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile out of range.")
+
+    tile = await tile_cache.get(z, x, y)
+    if tile is None:
+        # Read before querying, so a change that lands during the query keeps this tile out of the cache
+        generation = tile_cache.generation
+        envelope = func.ST_TileEnvelope(z, x, y)
+        # Also fetch points in the tile buffer so symbols are not cut at tile edges
+        margin = 2 * MERCATOR_HALF_WORLD / (2 ** z) * TILE_BUFFER / TILE_EXTENT
+        search_area = func.ST_Transform(func.ST_Expand(envelope, margin), 4326)
+
+        rows = (
+            select(
+                cast(Report.id, String).label("report_id"),
+                case({h.name: h.value for h in HazardType}, value=cast(Report.user_hazard_type, String)).label("hazard_type"),
+                cast(Report.status, String).label("status"),
+                func.coalesce(Report.final_confidence_score, 0.0).label("confidence"),
+                func.ST_AsMVTGeom(
+                    func.ST_Transform(report_point, 3857), envelope, TILE_EXTENT, TILE_BUFFER, True
+                ).label("geom")
+            )
+            .where(report_point.op("&&")(search_area))
+            .subquery("tile")
+        )
+        result = await db.execute(
+            select(func.ST_AsMVT(literal_column("tile"), "reports", TILE_EXTENT, "geom")).select_from(rows)
+        )
+        tile = bytes(result.scalar() or b"")
+        await tile_cache.put(z, x, y, tile, generation)
+
+    return Response(content=tile, media_type="application/vnd.mapbox-vector-tile")
 
 
 @router.get("/recent", summary="List recent reports with basic info")
-async def list_recent_reports(limit: int = 9, db: AsyncSession = Depends(get_db)):
-    """Return most recent reports with minimal fields for the dashboard.
+async def list_recent_reports(
+    limit: int = Query(9, ge=1, le=MAX_RECENT_LIMIT, description="Number of reports per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Return most recent reports with minimal fields for the dashboard, newest first.
     Includes: id, hazard_type, status, created_at, user_description, user_city, thumbnail_url.
+    Pages are keyset-paginated on (created_at, id); pass next_cursor to get the next one.
     """
-    # Clamp limit to a reasonable range
-    safe_limit = max(1, min(limit, 24))
+    # First media file (by created_at) of each report, fetched in the same query
+    thumbnail = (
+        select(Media.file_url)
+        .where(Media.report_id == Report.id, Media.report_created_at == Report.created_at)
+        .order_by(Media.created_at.asc())
+        .limit(1)
+        .lateral("thumbnail")
+    )
 
-    result = await db.execute(
-        select(Report).order_by(Report.created_at.desc()).limit(safe_limit)
+    query = (
+        select(
+            Report.id,
+            Report.user_hazard_type,
+            Report.status,
+            Report.created_at,
+            Report.user_description,
+            Report.user_city,
+            thumbnail.c.file_url
+        )
+        .outerjoin(thumbnail, true())
+        .order_by(Report.created_at.desc(), Report.id.desc())
+        .limit(limit + 1)
     )
-    reports = result.scalars().all()
+    if cursor is not None:
+        cursor_created_at, cursor_id = _decode_cursor(cursor)
+        # The plain created_at bound lets Postgres skip partitions newer than the cursor
+        query = query.where(
+            Report.created_at <= cursor_created_at,
+            tuple_(Report.created_at, Report.id) < tuple_(cursor_created_at, cursor_id)
+        )
 
-    items: List[dict] = []
-    for r in reports:
-        thumb_url = None
-        try:
-            # Fetch one media file (first by created_at) for thumbnail if available
-            m_res = await db.execute(
-                select(Media.file_url).where(Media.report_id == r.id).order_by(Media.created_at.asc()).limit(1)
-            )
-            mrow = m_res.first()
-            if mrow:
-                thumb_url = mrow[0]
-        except Exception:
-            thumb_url = None
+    result = await db.execute(query)
+    rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
+    items: List[dict] = []
+    for (rid, hazard, status, created_at, description, city, thumb_url) in rows:
         items.append({
-            "id": str(r.id),
-            "hazard_type": r.user_hazard_type.value if hasattr(r.user_hazard_type, 'value') else str(r.user_hazard_type),
-            "status": r.status.value if hasattr(r.status, 'value') else str(r.status),
-            "created_at": r.created_at.isoformat() if r.created_at else None,
-            "user_description": r.user_description,
-            "user_city": r.user_city,
+            "id": str(rid),
+            "hazard_type": hazard.value if hasattr(hazard, 'value') else str(hazard),
+            "status": status.value if hasattr(status, 'value') else str(status),
+            "created_at": created_at.isoformat() if created_at else None,
+            "user_description": description,
+            "user_city": city,
             "thumbnail_url": thumb_url,
         })
 
-    return {"items": items, "count": len(items)}
\ No newline at end of file
+    next_cursor = _encode_cursor(rows[-1][3], rows[-1][0]) if has_more else None
+    return {"items": items, "count": len(items), "next_cursor": next_cursor, "has_more": has_more}
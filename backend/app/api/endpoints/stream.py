@@ -0,0 +1,58 @@
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.db.models import HazardType
+from app.core.config import settings
+from app.services.report_stream import report_stream, StreamSubscription
+from app.api.dependencies import parse_bbox
+
+router = APIRouter()
+
+@router.get(
+    "/reports",
+    summary="Stream report updates",
+    description="Server-Sent Events stream of new reports and confidence/status changes."
+)
+async def stream_reports(
+    bbox: Optional[str] = Query(None, description="Only events inside 'min_lng,min_lat,max_lng,max_lat'"),
+    hazard_type: List[HazardType] = Query([], description="Only events for these hazard types"),
+):
+    """
+    Pushes 'report_created' and 'report_scored' events as they happen, so clients
+    no longer need to poll /hotspots or /recent. Clients that disconnect or fall
+    behind should resync with /api/reports/hotspots/changes and reconnect.
+    """
+    viewport = parse_bbox(bbox) if bbox is not None else None
+    subscription = report_stream.subscribe(viewport, {h.value for h in hazard_type})
+    if subscription is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many stream subscribers, please poll instead.",
+            headers={"Retry-After": "30"}
+        )
+
+    return StreamingResponse(
+        _event_source(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _event_source(subscription: StreamSubscription):
+    try:
+        # Tell EventSource clients how long to wait before reconnecting
+        yield b"retry: 5000\n\n"
+        while not subscription.closed:
+            try:
+                payload = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # Comment line keeps idle connections open through proxies
+                yield b": keep-alive\n\n"
+                continue
+            yield payload
+    finally:
+        report_stream.unsubscribe(subscription)
@@ -0,0 +1,269 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, Response
+from botocore.exceptions import ClientError
+from typing import Optional, Dict
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+import base64
+import binascii
+import uuid
+
+from app.db.models import UploadSession, MediaType
+from app.db.session import get_db
+from app.core.config import settings
+from app.services.s3_service import s3_service, media_type_for_content_type, MIN_MULTIPART_PART_BYTES
+from app.api.dependencies import get_current_principal, Principal
+
+router = APIRouter()
+
+TUS_VERSION = "1.0.0"
+CHUNK_CONTENT_TYPE = "application/offset+octet-stream"
+
+
+def _parse_upload_metadata(upload_metadata: Optional[str]) -> Dict[str, str]:
+    """Decode a tus Upload-Metadata header: comma-separated 'key base64value' pairs."""
+    metadata = {}
+    for pair in (upload_metadata or "").split(","):
+        if not pair.strip():
+            continue
+        key, _, value = pair.strip().partition(" ")
+        try:
+            metadata[key] = base64.b64decode(value).decode() if value else ""
+        except (binascii.Error, UnicodeDecodeError):
+            raise HTTPException(status_code=400, detail=f"Invalid Upload-Metadata value for {key}.")
+    return metadata
+
+
+async def _get_session(
+    db: AsyncSession, upload_id: uuid.UUID, user: Principal, for_update: bool = False
+) -> UploadSession:
+    """Load one of the user's upload sessions, rejecting unknown and expired ones."""
+    query = select(UploadSession).where(UploadSession.id == upload_id, UploadSession.user_id == user.id)
+    if for_update:
+        query = query.with_for_update().execution_options(populate_existing=True)
+    session = (await db.execute(query)).scalars().first()
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload not found.")
+    if not session.completed and session.expires_at <= datetime.now(timezone.utc):
+        raise HTTPException(status_code=410, detail="Upload has expired.")
+    return session
+
+
+async def _completed_earlier(error: Exception, s3_key: str, length: int) -> bool:
+    """
+    Whether a failed last chunk failed because an earlier attempt already completed
+    the multipart upload: S3 no longer knows the upload, and the object exists with
+    the full length.
+    """
+    if not isinstance(error, ClientError) or error.response.get("Error", {}).get("Code") != "NoSuchUpload":
+        return False
+    try:
+        head, = await s3_service.head_objects([s3_key])
+    except Exception:
+        return False
+    return head is not None and head["size"] == length
+
+
+def _offset_headers(session: UploadSession) -> Dict[str, str]:
+    return {
+        "Tus-Resumable": TUS_VERSION,
+        "Upload-Offset": str(session.offset),
+        "Upload-Length": str(session.length),
+        "Cache-Control": "no-store"
+    }
+
+
+@router.post("", status_code=201, summary="Start a resumable media upload")
+async def create_upload(
+    response: Response,
+    upload_length: int = Header(..., gt=0, description="Total size of the file in bytes"),
+    upload_metadata: Optional[str] = Header(
+        None, description="tus metadata: 'filename <base64>,filetype <base64>'; filetype is required"
+    ),
+    report_id: Optional[uuid.UUID] = Header(None, alias="X-Report-Id", description="report_id the media belongs to"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Creates an upload session (tus-style) for one media file. The file is then sent
+    with PATCH requests of at least min_chunk_bytes each (only the last may be smaller),
+    and HEAD tells where to resume after a dropped connection. Once the upload is
+    complete, pass report_id and key to /api/reports/submit as media_keys.
+    Chunks arrive in separate requests, possibly on different processes, and a SHA-256
+    state cannot be carried between them, so resumable uploads are stored without a
+    content_hash and are not deduplicated; use /api/reports/media/stream for that.
+    Unfinished uploads are discarded by cleanup_uploads.py once they expire.
+    """
+    metadata = _parse_upload_metadata(upload_metadata)
+    content_type = metadata.get("filetype")
+    media_type = media_type_for_content_type(content_type)
+    if media_type is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported media type: {content_type}")
+    if upload_length > settings.MAX_MEDIA_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Media larger than {settings.MAX_MEDIA_UPLOAD_BYTES} bytes is not accepted."
+        )
+
+    report_id = report_id or uuid4()
+    key = s3_service.build_key(media_type, current_user.id, report_id, metadata.get("filename"))
+    try:
+        s3_upload_id = await s3_service.create_multipart_upload(key, content_type)
+    except Exception as e:
+        print(f"Error starting multipart upload for {key}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start upload.")
+
+    session = UploadSession(
+        user_id=current_user.id,
+        report_id=report_id,
+        s3_key=key,
+        s3_upload_id=s3_upload_id,
+        content_type=content_type,
+        media_type=MediaType(media_type),
+        length=upload_length,
+        offset=0,
+        parts=[],
+        expires_at=datetime.now(timezone.utc) + timedelta(hours=settings.UPLOAD_SESSION_EXPIRE_HOURS)
+    )
+    db.add(session)
+    await db.commit()
+
+    response.headers["Location"] = f"/api/uploads/{session.id}"
+    response.headers["Tus-Resumable"] = TUS_VERSION
+    return {
+        "upload_id": session.id,
+        "report_id": report_id,
+        "key": key,
+        "media_type": media_type,
+        "min_chunk_bytes": MIN_MULTIPART_PART_BYTES,
+        "max_chunk_bytes": settings.MAX_UPLOAD_CHUNK_BYTES
+    }
+
+
+@router.head("/{upload_id}", summary="Get the offset to resume an upload from")
+async def get_upload_offset(
+    upload_id: uuid.UUID,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Returns Upload-Offset, the number of bytes stored so far, and Upload-Length."""
+    session = await _get_session(db, upload_id, current_user)
+    return Response(status_code=200, headers=_offset_headers(session))
+
+
+@router.patch("/{upload_id}", status_code=204, summary="Append a chunk to an upload")
+async def append_upload_chunk(
+    upload_id: uuid.UUID,
+    request: Request,
+    upload_offset: int = Header(..., ge=0, description="Offset the chunk starts at; must equal the current offset"),
+    content_type: str = Header(..., description=f"Must be {CHUNK_CONTENT_TYPE}"),
+    content_length: Optional[int] = Header(None, description="Size of the chunk in bytes"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Appends one chunk, stored as the next part of the S3 multipart upload. A chunk is
+    either stored whole or not at all, so after a failure the client asks HEAD for the
+    offset and re-sends only that chunk. The last chunk completes the upload; if an
+    earlier attempt at it completed the S3 upload but was not recorded, a retry
+    records it.
+    The offset is claimed and the part recorded in two short transactions; no
+    connection or row lock is held while the chunk is sent to S3.
+    """
+    if content_type.split(";")[0].strip() != CHUNK_CONTENT_TYPE:
+        raise HTTPException(status_code=415, detail=f"Content-Type must be {CHUNK_CONTENT_TYPE}.")
+    if content_length is None:
+        raise HTTPException(status_code=411, detail="Content-Length is required.")
+    if content_length > max(settings.MAX_UPLOAD_CHUNK_BYTES, MIN_MULTIPART_PART_BYTES):
+        raise HTTPException(status_code=413, detail=f"Chunks larger than {settings.MAX_UPLOAD_CHUNK_BYTES} bytes are not accepted.")
+
+    session = await _get_session(db, upload_id, current_user)
+    if session.completed:
+        raise HTTPException(status_code=409, detail="Upload is already complete.", headers=_offset_headers(session))
+    if upload_offset != session.offset:
+        raise HTTPException(status_code=409, detail="Upload-Offset does not match the current offset.", headers=_offset_headers(session))
+    end = upload_offset + content_length
+    if end > session.length:
+        raise HTTPException(status_code=400, detail="Chunk extends past Upload-Length.")
+    if end < session.length and content_length < MIN_MULTIPART_PART_BYTES:
+        raise HTTPException(status_code=400, detail=f"Only the last chunk may be smaller than {MIN_MULTIPART_PART_BYTES} bytes.")
+
+    # End the read transaction so no connection is held while the chunk arrives
+    await db.commit()
+
+    # Receive the whole chunk before touching the session, so a dropped connection stores nothing
+    chunk = bytearray()
+    async for data in request.stream():
+        chunk += data
+        if len(chunk) > content_length:
+            raise HTTPException(status_code=400, detail="Request body is longer than Content-Length.")
+    if len(chunk) != content_length:
+        raise HTTPException(status_code=400, detail="Request body is shorter than Content-Length.")
+
+    # Claim the offset under a short row lock, released before the chunk goes to S3.
+    # A retried chunk may have raced the original, so everything is re-checked here.
+    session = await _get_session(db, upload_id, current_user, for_update=True)
+    if session.completed or session.offset != upload_offset:
+        raise HTTPException(status_code=409, detail="Upload-Offset does not match the current offset.", headers=_offset_headers(session))
+    now = datetime.now(timezone.utc)
+    if session.chunk_claimed_until is not None and session.chunk_claimed_until > now:
+        raise HTTPException(status_code=409, detail="A chunk at this offset is still being stored.", headers=_offset_headers(session))
+    claim_id = uuid4()
+    session.chunk_claim_id = claim_id
+    session.chunk_claimed_until = now + timedelta(seconds=settings.UPLOAD_CHUNK_CLAIM_SECONDS)
+    s3_key, s3_upload_id = session.s3_key, session.s3_upload_id
+    parts = list(session.parts)
+    await db.commit()
+
+    try:
+        # Part numbers follow the offset, so a retry after an expired claim replaces the same part
+        part = await s3_service.upload_part(s3_key, s3_upload_id, len(parts) + 1, bytes(chunk))
+        parts.append(part)
+        if end == session.length:
+            await s3_service.complete_multipart_upload(s3_key, s3_upload_id, parts)
+    except Exception as e:
+        # The attempt that completed the upload may have lost its claim or failed to record it
+        if not (end == session.length and await _completed_earlier(e, s3_key, session.length)):
+            print(f"Error storing chunk of upload {upload_id}: {e}")
+            await db.execute(
+                update(UploadSession)
+                .where(UploadSession.id == upload_id, UploadSession.chunk_claim_id == claim_id)
+                .values(chunk_claim_id=None, chunk_claimed_until=None)
+            )
+            await db.commit()
+            raise HTTPException(status_code=500, detail="Failed to store chunk.")
+
+    # Record the stored part in a second short transaction
+    session = await _get_session(db, upload_id, current_user, for_update=True)
+    if session.chunk_claim_id != claim_id:
+        # The claim expired and a retry of this chunk took over
+        raise HTTPException(status_code=409, detail="Upload-Offset does not match the current offset.", headers=_offset_headers(session))
+    session.parts = parts
+    session.offset = end
+    session.completed = end == session.length
+    session.chunk_claim_id = None
+    session.chunk_claimed_until = None
+    await db.commit()
+    if session.completed:
+        print(f"Completed resumable upload {upload_id} to {session.s3_key}")
+
+    return Response(status_code=204, headers=_offset_headers(session))
+
+
+@router.delete("/{upload_id}", status_code=204, summary="Cancel an upload")
+async def cancel_upload(
+    upload_id: uuid.UUID,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """Discards an unfinished upload and the parts stored for it."""
+    session = await _get_session(db, upload_id, current_user, for_update=True)
+    if session.completed:
+        raise HTTPException(status_code=409, detail="Upload is already complete.")
+
+    await s3_service.abort_multipart_upload(session.s3_key, session.s3_upload_id)
+    await db.delete(session)
+    await db.commit()
+    return Response(status_code=204, headers={"Tus-Resumable": TUS_VERSION})
@@ -3,10 +3,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
-from app.db.models import Verification, VerificationSource, Report
+from app.db.queries import get_report
+from app.db.models import Verification, VerificationSource
 from app.models.pydantic_models import VerificationCreate
 from app.services.confidence_calculator import confidence_calculator
 from app.services.verification_tracker import verification_tracker
+from app.services.report_events import report_events
 from sqlalchemy.future import select
 
 router = APIRouter()
@@ -22,32 +24,20 @@ async def submit_weather_verification(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Creates a new verification record with the source set to 'weather_api'.
-    It first checks if the original report exists.
+    Creates a new verification record with the source set to 'weather_api' and, in
+    the same statement, updates the report's confidence (404 if the report does not exist).
     """
-    # Check if the report exists before adding a verification for it
-    report_exists = await db.get(Report, verification_in.report_id)
-    if not report_exists:
+    confidence_result = await verification_tracker.record_verification(
+        db, verification_in.report_id, VerificationSource.weather_api, verification_in.result_data
+    )
+    if confidence_result is None:
         raise HTTPException(
             status_code=404,
             detail=f"Report with ID {verification_in.report_id} not found."
         )
-
-    new_verification_record = Verification(
-        report_id=verification_in.report_id,
-        source=VerificationSource.weather_api, # Set the source
-        result_data=verification_in.result_data # Store the flexible JSON data
-    )
-    db.add(new_verification_record)
-    await db.commit()
-    
-    # Trigger automatic confidence calculation
-    confidence_result = await verification_tracker.check_and_calculate_confidence(
-        str(verification_in.report_id), db
-    )
     
     response_message = "Weather verification successfully recorded."
-    if confidence_result:
+    if confidence_result["confidence_level"]:
         response_message += f" Confidence automatically calculated: {confidence_result['confidence_score']:.2f} ({confidence_result['confidence_level']})"
     
     return {"message": response_message}
@@ -63,32 +53,20 @@ async def submit_nlp_verification(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Creates a new verification record with the source set to 'nlp_pipeline'.
-    It first checks if the original report exists.
+    Creates a new verification record with the source set to 'nlp_pipeline' and, in
+    the same statement, updates the report's confidence (404 if the report does not exist).
     """
-    # Check if the report exists before adding a verification for it
-    report_exists = await db.get(Report, verification_in.report_id)
-    if not report_exists:
+    confidence_result = await verification_tracker.record_verification(
+        db, verification_in.report_id, VerificationSource.nlp_pipeline, verification_in.result_data
+    )
+    if confidence_result is None:
         raise HTTPException(
             status_code=404,
             detail=f"Report with ID {verification_in.report_id} not found."
         )
-
-    new_verification_record = Verification(
-        report_id=verification_in.report_id,
-        source=VerificationSource.nlp_pipeline, # Set the source
-        result_data=verification_in.result_data # Store the flexible JSON data
-    )
-    db.add(new_verification_record)
-    await db.commit()
-    
-    # Trigger automatic confidence calculation
-    confidence_result = await verification_tracker.check_and_calculate_confidence(
-        str(verification_in.report_id), db
-    )
     
     response_message = "NLP verification successfully recorded."
-    if confidence_result:
+    if confidence_result["confidence_level"]:
         response_message += f" Confidence automatically calculated: {confidence_result['confidence_score']:.2f} ({confidence_result['confidence_level']})"
     
     return {"message": response_message}
@@ -104,9 +82,10 @@ async def get_confidence_score(
 ):
     """
     Calculate confidence score based on all verification results for a report.
+    Stores the new score and status, so it stays on the primary despite being a GET.
     """
     # Get the report
-    report = await db.get(Report, report_id)
+    report = await get_report(db, report_id)
     if not report:
         raise HTTPException(
             status_code=404,
@@ -115,7 +94,9 @@ async def get_confidence_score(
     
     # Get all verifications for this report
     result = await db.execute(
-        select(Verification).where(Verification.report_id == report_id)
+        select(Verification).where(
+            Verification.report_id == report_id, Verification.report_created_at == report.created_at
+        )
     )
     verifications = result.scalars().all()
     
@@ -134,6 +115,7 @@ async def get_confidence_score(
     # Medium and Low remain "under_verification" for manual review
     
     await db.commit()
+    await report_events.publish_report("report_scored", report, db)
     
     return {
         "report_id": report_id,
@@ -7,21 +7,124 @@ class Settings(BaseSettings):
     # --- Core Services ---
     DATABASE_URL: str
     SYNC_DATABASE_URL: str
+    # Connection pool per process: DB_POOL_SIZE kept open, up to DB_MAX_OVERFLOW more under load
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    # Logs every SQL statement; for local debugging only
+    DB_ECHO: bool = False
+    # Optional streaming replica for read-only endpoints; reads go to the primary while
+    # its replay lag is above REPLICA_MAX_LAG_SECONDS or it cannot be reached
+    READ_REPLICA_URL: str | None = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_SECONDS: float = 1.0
     RABBITMQ_URL: str
     
     # --- JWT Security ---
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # A refresh token presented again within this many seconds of being exchanged
+    # (two tabs, a retried request) is honoured instead of ending the session as reuse
+    REFRESH_REUSE_GRACE_SECONDS: float = 30.0
+    # Revoked tokens: how often each process syncs its Bloom filter, how often it is
+    # rebuilt from scratch, and the number of ids it is sized for
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 5.0
+    TOKEN_REVOCATION_REBUILD_SECONDS: float = 600.0
+    TOKEN_REVOCATION_CAPACITY: int = 100000
+
+    # --- Password Hashing ---
+    BCRYPT_ROUNDS: int = 12
+    # Stored hashes with a different cost are re-hashed to BCRYPT_ROUNDS on successful login
+    PASSWORD_REHASH_ON_LOGIN: bool = True
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # --- Authenticated User Cache ---
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 60.0
     
     # --- AWS S3 Settings ---
     AWS_ACCESS_KEY_ID: str
     AWS_SECRET_ACCESS_KEY: str
     AWS_S3_BUCKET_NAME: str
     AWS_S3_REGION: str
+    # Set to use an S3-compatible store such as MinIO or LocalStack
+    AWS_S3_ENDPOINT_URL: str | None = None
+    S3_UPLOAD_MAX_CONCURRENCY: int = 8
+    S3_PRESIGN_EXPIRE_SECONDS: int = 900
+    # Streaming uploads: S3 part size (also the per-request buffer) and the size cap
+    S3_MULTIPART_PART_BYTES: int = 8 * 1024 * 1024
+    MAX_MEDIA_UPLOAD_BYTES: int = 200 * 1024 * 1024
+    # Resumable uploads: largest accepted chunk, and how long an unfinished upload can be resumed
+    MAX_UPLOAD_CHUNK_BYTES: int = 16 * 1024 * 1024
+    UPLOAD_SESSION_EXPIRE_HOURS: int = 24
+    # How long one chunk may take to reach S3 before a retry of it is accepted
+    UPLOAD_CHUNK_CLAIM_SECONDS: int = 300
 
     WEATHERAPI_KEY: str
 
+    # --- Report Admission Control ---
+    # Token buckets: sustained reports per second and burst size, per user and per API process
+    SUBMIT_RATE_PER_USER: float = 0.5
+    SUBMIT_BURST_PER_USER: int = 50
+    SUBMIT_RATE_GLOBAL: float = 200.0
+    SUBMIT_BURST_GLOBAL: int = 1000
+    # report_processing_queue depth above which reports go to the low-priority queue,
+    # and above which submissions are refused with 503
+    QUEUE_LOW_PRIORITY_WATERMARK: int = 5000
+    QUEUE_REJECT_WATERMARK: int = 20000
+    QUEUE_DEPTH_CHECK_SECONDS: float = 2.0
+    SUBMIT_RETRY_AFTER_SECONDS: int = 30
+
+    # --- Coordinator Worker ---
+    # Reports are saved in batches of up to COORDINATOR_BATCH_SIZE, waiting at most
+    # COORDINATOR_BATCH_MAX_WAIT_MS for a batch to fill. The prefetch should exceed the
+    # batch size so the next batch arrives while one is being written.
+    COORDINATOR_BATCH_SIZE: int = 100
+    COORDINATOR_BATCH_MAX_WAIT_MS: int = 50
+    COORDINATOR_PREFETCH: int = 200
+
+    # --- Vector Tile Cache ---
+    TILE_CACHE_DIR: str = ".tile_cache"
+    TILE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    # Cached tiles older than this are regenerated, in case an invalidation was missed
+    TILE_CACHE_MAX_AGE_SECONDS: float = 3600.0
+
+    # --- Hotspot Response Cache ---
+    HOTSPOT_CACHE_MAX_ENTRIES: int = 256
+    # Cached responses are rebuilt after this long even without a report event
+    HOTSPOT_CACHE_MAX_AGE_SECONDS: float = 60.0
+    # Hotspot and cluster queries with active=true cover the reports created in this many
+    # days, so they only read the newest monthly partitions
+    HOTSPOT_ACTIVE_DAYS: int = 30
+
+    # --- Report Partitioning ---
+    # Monthly partitions created ahead of time by partition_maintenance.py
+    PARTITION_PREMAKE_MONTHS: int = 3
+    # Months of reports kept attached; older partitions are detached into
+    # PARTITION_ARCHIVE_SCHEMA. Unset keeps everything.
+    REPORT_RETENTION_MONTHS: int | None = None
+    PARTITION_ARCHIVE_SCHEMA: str = "archive"
+
+    # --- Cold Archive & Analytics ---
+    # Parquet files written by export_archive.py and queried by the analytics API
+    ARCHIVE_DIR: str = "report_archive"
+    EXPORT_BATCH_ROWS: int = 50000
+    # A month is exported once this many days have passed since it ended, so late
+    # verifications of its reports are included
+    EXPORT_GRACE_DAYS: int = 7
+    ANALYTICS_THREADS: int = 4
+    ANALYTICS_MAX_CONCURRENT_QUERIES: int = 2
+
+    # --- Report Event Stream ---
+    STREAM_MAX_SUBSCRIBERS: int = 20000
+    STREAM_QUEUE_SIZE: int = 256
+    STREAM_HEARTBEAT_SECONDS: int = 15
+
     model_config = SettingsConfigDict(env_file=".env")
 
 settings = Settings()
@@ -1,10 +1,35 @@
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional, Tuple
+from fastapi import HTTPException
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.db.models import User
+from app.services.metrics import metrics
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with any other cost factor are flagged by needs_update / verify_and_update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
+
+# bcrypt is CPU-bound but releases the GIL, so a small thread pool keeps it off the
+# event loop and caps how many cores a login storm can take from other requests
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
+password_queue_wait = metrics.histogram("password_hash_queue_seconds", "Time a password hash or check waited for a bcrypt thread")
+password_hash_time = metrics.histogram("password_hash_seconds", "Time to hash or check one password")
+password_rejected = metrics.counter("password_hash_rejected_total", "Password hashes or checks refused because too many were queued")
+_pending_password_jobs = 0
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -12,13 +37,62 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
-def create_access_token(data: dict) -> str:
+async def _run_password_job(job: Callable, *args):
+    """
+    Runs a bcrypt call on the password pool, recording how long it queued and ran.
+    Past PASSWORD_HASH_MAX_PENDING queued calls, answers 503 instead of queueing more.
+    """
+    global _pending_password_jobs
+    if _pending_password_jobs >= settings.PASSWORD_HASH_MAX_PENDING:
+        password_rejected.inc()
+        raise HTTPException(
+            status_code=503,
+            detail="Too many sign-ins in progress; please retry shortly.",
+            headers={"Retry-After": "1"}
+        )
+
+    submitted = time.perf_counter()
+
+    def timed_job():
+        started = time.perf_counter()
+        password_queue_wait.observe(started - submitted)
+        try:
+            return job(*args)
+        finally:
+            password_hash_time.observe(time.perf_counter() - started)
+
+    _pending_password_jobs += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, timed_job)
+    finally:
+        _pending_password_jobs -= 1
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_job(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Checks a password off the event loop. Returns (valid, new_hash), where new_hash is
+    set when the stored hash should be replaced because it uses another cost factor.
+    Without PASSWORD_REHASH_ON_LOGIN only the check runs, never a rehash.
+    """
+    if not settings.PASSWORD_REHASH_ON_LOGIN:
+        return await _run_password_job(verify_password, plain_password, hashed_password), None
+    return await _run_password_job(pwd_context.verify_and_update, plain_password, hashed_password)
+
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
+def _encode_token(data: dict, token_type: str, lifetime: timedelta) -> str:
     to_encode = data.copy()
     
-    expire = datetime.now(timezone.utc) + timedelta(
-        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-    )
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    to_encode.update({
+        "exp": now + lifetime,
+        "iat": now,
+        "typ": token_type,
+        "jti": uuid.uuid4().hex
+    })
     
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
@@ -26,3 +100,42 @@ def create_access_token(data: dict) -> str:
     
     return encoded_jwt
 
+def create_access_token(data: dict) -> str:
+    return _encode_token(data, ACCESS_TOKEN_TYPE, timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+
+def create_token_pair(user: User, session_id: Optional[str] = None) -> dict:
+    """
+    Issues a short-lived access token and a refresh token for one login session.
+    The access token carries role and active claims so requests can be authorized
+    without loading the user; 'sid' ties both tokens to the session for logout.
+    """
+    session_id = session_id or uuid.uuid4().hex
+    access_token = create_access_token({
+        "sub": str(user.id),
+        "sid": session_id,
+        "role": user.role.value if hasattr(user.role, "value") else user.role,
+        "active": user.is_active
+    })
+    refresh_token = _encode_token(
+        {"sub": str(user.id), "sid": session_id},
+        REFRESH_TOKEN_TYPE,
+        timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+def decode_token(token: str, token_type: str, verify_exp: bool = True) -> dict:
+    """
+    Verifies a token's signature (and expiry) and that it is of the expected type.
+    Tokens issued before typed tokens existed count as access tokens. Raises JWTError.
+    """
+    payload = jwt.decode(
+        token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM], options={"verify_exp": verify_exp}
+    )
+    if payload.get("typ", ACCESS_TOKEN_TYPE) != token_type or payload.get("sub") is None:
+        raise JWTError(f"Not a valid {token_type} token.")
+    return payload
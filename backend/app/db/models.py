@@ -1,10 +1,10 @@
 import enum
 from sqlalchemy import (
-    Column, Integer, String, Boolean, text, ForeignKey, Float,
-    TIMESTAMP
+    Column, Integer, BigInteger, String, Boolean, text, ForeignKey, Float,
+    TIMESTAMP, Index, cast, ForeignKeyConstraint
 )
 from sqlalchemy.dialects.postgresql import UUID, ENUM, JSONB
-from geoalchemy2 import Geography
+from geoalchemy2 import Geography, Geometry
 from sqlalchemy.orm import declarative_base, relationship
 import uuid
 
@@ -54,6 +54,21 @@ class VerificationSource(str, enum.Enum):
     weather_api = "weather_api"
     peer_report = "peer_report"
 
+# Bit of each source in Report.verification_sources / verification_error_sources
+VERIFICATION_SOURCE_BITS = {
+    VerificationSource.nlp_pipeline: 1,
+    VerificationSource.weather_api: 2,
+    VerificationSource.peer_report: 4,
+}
+
+# Reports below this confidence are not shown as hotspots
+HOTSPOT_CONFIDENCE_THRESHOLD = 0.35
+
+# reports, media and verifications are range-partitioned by month on the report's
+# created_at (see migrations/0004 and partition_maintenance.py). Postgres requires the
+# partition key in every primary key and unique constraint, so it is part of theirs,
+# and media/verifications carry report_created_at to reference their report.
+
 # --- Main Tables ---
 
 class User(Base):
@@ -77,38 +92,173 @@ class Report(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     
     user_hazard_type = Column(ENUM(HazardType, name="hazard_type"), nullable=False)
-    user_location = Column(Geography(geometry_type='POINT', srid=4326), nullable=False)
+    # The GIST index is declared explicitly in __table_args__ below
+    user_location = Column(Geography(geometry_type='POINT', srid=4326, spatial_index=False), nullable=False)
     user_description = Column(String)
     user_city = Column(String(255), nullable=True)
     
     status = Column(ENUM(ReportStatus, name="report_status"), nullable=False, default=ReportStatus.under_verification)
     final_confidence_score = Column(Float, default=0.0)
-    created_at = Column(TIMESTAMP(timezone=True), server_default=text("TIMEZONE('utc', now())"), nullable=False)
+    # Running confidence aggregates, updated with each verification insert (see
+    # VerificationTracker): sum(score * weight), sum(weight) and source bitmasks
+    confidence_weighted_sum = Column(Float, default=0.0, server_default=text("0"), nullable=False)
+    confidence_weight = Column(Float, default=0.0, server_default=text("0"), nullable=False)
+    verification_sources = Column(Integer, default=0, server_default=text("0"), nullable=False)
+    verification_error_sources = Column(Integer, default=0, server_default=text("0"), nullable=False)
+    # Partition key; look reports up by id with app.db.queries.get_report
+    created_at = Column(
+        TIMESTAMP(timezone=True), primary_key=True, server_default=text("TIMEZONE('utc', now())"), nullable=False
+    )
+    # Bumped on every status / score change; drives the /hotspots/changes delta feed
+    updated_at = Column(
+        TIMESTAMP(timezone=True),
+        server_default=text("TIMEZONE('utc', now())"),
+        onupdate=text("TIMEZONE('utc', now())"),
+        nullable=False
+    )
     
     user = relationship("User", back_populates="reports")
     media_files = relationship("Media", back_populates="report", cascade="all, delete-orphan")
     verifications = relationship("Verification", back_populates="report", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Expression index on the planar point so viewport and tile lookups
+        # (ST_Intersects / && against lat-lng rectangles) can use it
+        Index(
+            "idx_reports_user_location",
+            cast(user_location, Geometry("POINT", srid=4326)),
+            postgresql_using="gist"
+        ),
+        # Keyset scans of the delta feed: WHERE (updated_at, id) > cursor ORDER BY updated_at, id
+        Index("ix_reports_updated_at_id", "updated_at", "id"),
+        # Newest-first keyset pagination of /recent
+        Index("ix_reports_created_at_id", "created_at", "id"),
+        # Rows arrive in created_at order, so a BRIN index lets time windows skip old pages
+        Index("ix_reports_created_at_brin", "created_at", postgresql_using="brin"),
+        # Status filters outside the hotspot range (e.g. reports still under verification)
+        Index("ix_reports_status", "status"),
+        # Hotspot filters on status and confidence; only hotspot-eligible rows are indexed
+        Index(
+            "ix_reports_hotspot_status_confidence",
+            "status",
+            "final_confidence_score",
+            postgresql_where=text(f"final_confidence_score >= {HOTSPOT_CONFIDENCE_THRESHOLD}")
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+# Report location as a planar point, for ST_X/ST_Y, grid snapping and tiling.
+# Matches the expression of the idx_reports_user_location GIST index.
+report_point = cast(Report.user_location, Geometry("POINT", srid=4326))
+
 class Media(Base):
     __tablename__ = "media"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    report_id = Column(UUID(as_uuid=True), ForeignKey("reports.id"), nullable=False)
+    report_id = Column(UUID(as_uuid=True), nullable=False)
+    # Partition key: media lives in the same month's partition as its report
+    report_created_at = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False)
     
     file_url = Column(String, nullable=False)
     media_type = Column(ENUM(MediaType, name="media_type"), nullable=False)
     
     file_metadata = Column(JSONB, nullable=True)
+    # SHA-256 of the file bytes; media with the same hash share one stored object
+    content_hash = Column(String(64), index=True, nullable=True)
     
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("TIMEZONE('utc', now())"), nullable=False)
     
     report = relationship("Report", back_populates="media_files")
 
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["report_id", "report_created_at"], ["reports.id", "reports.created_at"], name="fk_media_report"
+        ),
+        # First-media (thumbnail) lookup per report
+        Index("ix_media_report_id_created_at", "report_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (report_created_at)"},
+    )
+
+class MediaBlob(Base):
+    """
+    One stored object per distinct file content. Uploads whose SHA-256 is already
+    here reuse the existing object instead of storing another copy.
+    """
+    __tablename__ = "media_blobs"
+
+    content_hash = Column(String(64), primary_key=True)
+    s3_key = Column(String, unique=True, nullable=False)
+    file_url = Column(String, nullable=False)
+    media_type = Column(ENUM(MediaType, name="media_type"), nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text("TIMEZONE('utc', now())"), nullable=False)
+
+class MediaBlobOwner(Base):
+    """
+    Users who have uploaded a blob's content. A client that only names content (by
+    SHA-256 or object key) may attach it only if it is one of them; uploading the
+    bytes themselves adds the uploader here.
+    """
+    __tablename__ = "media_blob_owners"
+
+    content_hash = Column(String(64), ForeignKey("media_blobs.content_hash"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text("TIMEZONE('utc', now())"), nullable=False)
+
+class UploadSession(Base):
+    """
+    A resumable media upload: the file is appended chunk by chunk, each chunk stored
+    as one part of an S3 multipart upload, so an interrupted transfer resumes at
+    'offset' instead of starting over.
+    """
+    __tablename__ = "upload_sessions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    report_id = Column(UUID(as_uuid=True), nullable=False)
+
+    s3_key = Column(String, nullable=False)
+    s3_upload_id = Column(String, nullable=False)
+    content_type = Column(String, nullable=False)
+    media_type = Column(ENUM(MediaType, name="media_type"), nullable=False)
+
+    length = Column(BigInteger, nullable=False)
+    offset = Column(BigInteger, nullable=False, default=0)
+    # Completed S3 parts in order, as [{"ETag": ..., "PartNumber": ...}]
+    parts = Column(JSONB, nullable=False, default=list)
+    completed = Column(Boolean, nullable=False, default=False)
+    # Set while a chunk at 'offset' is being sent to S3, outside any transaction;
+    # another chunk for the same offset is refused until the claim is released or expires
+    chunk_claim_id = Column(UUID(as_uuid=True), nullable=True)
+    chunk_claimed_until = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text("TIMEZONE('utc', now())"), nullable=False)
+    # The cleanup job looks sessions up by expiry
+    expires_at = Column(TIMESTAMP(timezone=True), index=True, nullable=False)
+
+class RevokedToken(Base):
+    """
+    A revoked JWT id (jti) or login session id (sid). Rows are kept until the
+    tokens they revoke would have expired anyway.
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(String(64), primary_key=True)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    revoked_at = Column(
+        TIMESTAMP(timezone=True), server_default=text("TIMEZONE('utc', now())"), nullable=False, index=True
+    )
+
 class Verification(Base):
     __tablename__ = "verifications"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    report_id = Column(UUID(as_uuid=True), ForeignKey("reports.id"), nullable=False)
+    # Confidence scoring loads all verifications of a report
+    report_id = Column(UUID(as_uuid=True), index=True, nullable=False)
+    # Partition key: verifications live in the same month's partition as their report
+    report_created_at = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False)
     
     source = Column(ENUM(VerificationSource, name="verification_source"), nullable=False)
     result_data = Column(JSONB, nullable=False)
@@ -117,3 +267,10 @@ class Verification(Base):
     
     report = relationship("Report", back_populates="verifications")
 
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["report_id", "report_created_at"], ["reports.id", "reports.created_at"], name="fk_verifications_report"
+        ),
+        {"postgresql_partition_by": "RANGE (report_created_at)"},
+    )
+
@@ -0,0 +1,17 @@
+import uuid
+from typing import Optional, Union
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.models import Report
+
+async def get_report(db: AsyncSession, report_id: Union[uuid.UUID, str]) -> Optional[Report]:
+    """
+    Load a report by id. The reports primary key is (id, created_at) because of
+    partitioning, so db.get(Report, id) does not work; this probes the primary key
+    index of each partition instead.
+    """
+    if not isinstance(report_id, uuid.UUID):
+        report_id = uuid.UUID(str(report_id))
+    result = await db.execute(select(Report).where(Report.id == report_id))
+    return result.scalars().first()
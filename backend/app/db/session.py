@@ -1,8 +1,71 @@
+import asyncio
+import time
+from typing import Optional
+from sqlalchemy import event, exc, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.services.metrics import metrics
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True, future=True)
+# Checkouts normally take well under a millisecond; waits show up in the upper buckets
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+pool_checkout_wait = metrics.histogram(
+    "db_pool_checkout_wait_seconds", "Time a request waited for a database connection", POOL_WAIT_BUCKETS
+)
+pool_in_use = metrics.gauge("db_pool_connections_in_use", "Database connections currently checked out")
+pool_open = metrics.gauge("db_pool_connections_open", "Database connections currently open (idle or in use)")
+pool_overflow = metrics.counter("db_pool_overflow_connections_total", "Connections opened beyond DB_POOL_SIZE")
+pool_timeouts = metrics.counter("db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT")
+replica_lag = metrics.gauge("db_replica_lag_seconds", "Replay lag of the read replica at the last check (-1 if unknown)")
+reads_on_replica = metrics.counter("db_reads_replica_total", "Read-only requests served by the read replica")
+reads_on_primary = metrics.counter(
+    "db_reads_primary_fallback_total", "Read-only requests sent to the primary because the replica was lagging or down"
+)
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - start)
+
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DB_ECHO,
+    future=True,
+    poolclass=InstrumentedAsyncPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE
+)
+
+@event.listens_for(engine.sync_engine.pool, "connect")
+def _on_pool_connect(dbapi_connection, connection_record):
+    pool_open.inc()
+    if pool_open.value > engine.sync_engine.pool.size():
+        pool_overflow.inc()
+
+@event.listens_for(engine.sync_engine.pool, "close")
+def _on_pool_close(dbapi_connection, connection_record):
+    pool_open.dec()
+
+@event.listens_for(engine.sync_engine.pool, "checkout")
+def _on_pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_in_use.inc()
+
+@event.listens_for(engine.sync_engine.pool, "checkin")
+def _on_pool_checkin(dbapi_connection, connection_record):
+    pool_in_use.dec()
 
 AsyncSessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine, class_=AsyncSession, expire_on_commit=False
@@ -15,3 +78,113 @@ async def get_db() -> AsyncSession:
         finally:
             await session.close()
 
+# --- Read replica ---
+
+read_engine = create_async_engine(
+    settings.READ_REPLICA_URL,
+    echo=settings.DB_ECHO,
+    future=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE
+) if settings.READ_REPLICA_URL else None
+
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=read_engine, class_=AsyncSession, expire_on_commit=False
+) if read_engine is not None else None
+
+# Seconds the replica trails the primary. Zero when it is streaming from the primary
+# and has replayed everything it received, so an idle primary does not look like
+# lag. A replica whose WAL receiver is not streaming may be missing any amount of
+# WAL, so its lag is the age of the last replayed transaction, which keeps growing
+# until it reconnects. pg_stat_wal_receiver only shows the status to roles with
+# pg_read_all_stats (or pg_monitor); without it the replica is treated the same way.
+# A server that is not in recovery is not a replica and reports zero, which lets two
+# independent local Postgres instances stand in for a primary/replica pair.
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+            AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+class ReplicaRouter:
+    """
+    Decides where read-only requests go. The replica's replay lag is measured every
+    REPLICA_LAG_CHECK_SECONDS; reads use the replica while the lag is known and at
+    most REPLICA_MAX_LAG_SECONDS, and fall back to the primary otherwise (including
+    when the replica cannot be reached). Without READ_REPLICA_URL all reads use the primary.
+    """
+
+    def __init__(self):
+        self.lag: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def use_replica(self) -> bool:
+        return read_engine is not None and self.lag is not None and self.lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+    @property
+    def staleness(self) -> float:
+        """Upper bound on how far replica reads trail the primary, in seconds."""
+        return (self.lag or 0.0) + settings.REPLICA_LAG_CHECK_SECONDS
+
+    async def check(self):
+        try:
+            async with read_engine.connect() as conn:
+                lag = (await conn.execute(REPLICA_LAG_QUERY)).scalar()
+            self.lag = max(0.0, float(lag)) if lag is not None else None
+        except Exception as e:
+            if self.lag is not None:
+                print(f"[ReplicaRouter] Replica unreachable, reading from the primary: {e}")
+            self.lag = None
+        replica_lag.set(-1 if self.lag is None else self.lag)
+
+    async def start(self):
+        if read_engine is None:
+            return
+        await self.check()
+        self.task = asyncio.create_task(self._check_loop())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+        if read_engine is not None:
+            await read_engine.dispose()
+
+    async def _check_loop(self):
+        while True:
+            await asyncio.sleep(settings.REPLICA_LAG_CHECK_SECONDS)
+            await self.check()
+
+# Global instance
+replica_router = ReplicaRouter()
+
+def read_session() -> AsyncSession:
+    """
+    New read-only session: on the read replica when it is caught up, otherwise on
+    the primary. Nothing may be written through it. Data read from the replica can
+    trail the primary by up to replica_staleness(session) seconds.
+    """
+    if replica_router.use_replica:
+        reads_on_replica.inc()
+        return ReadSessionLocal(info={"staleness": replica_router.staleness})
+    if read_engine is not None:
+        reads_on_primary.inc()
+    return AsyncSessionLocal()
+
+async def get_read_db() -> AsyncSession:
+    """Session dependency for read-only endpoints; see read_session."""
+    async with read_session() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+def replica_staleness(session: AsyncSession) -> float:
+    """How many seconds a session's reads may trail the primary (0 on the primary)."""
+    return session.info.get("staleness", 0.0)
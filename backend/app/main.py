@@ -3,6 +3,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.api import api_router
 from app.core.config import settings
 from app.services.rabbitmq_service import rabbitmq_service
+from app.services.report_events import report_events
+from app.services.tile_cache import tile_cache
+from app.services.hotspot_cache import hotspot_cache
+from app.services.report_stream import report_stream
+from app.services.user_cache import user_cache
+from app.services.token_revocation import token_revocations
+from app.db.session import replica_router
 
 app = FastAPI(
     title="Pravaah API",
@@ -21,10 +28,19 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     await rabbitmq_service.connect()
+    report_events.add_listener(tile_cache.on_report_event)
+    report_events.add_listener(hotspot_cache.on_report_event)
+    report_events.add_listener(report_stream.on_report_event)
+    await report_events.start()
+    await user_cache.start()
+    await token_revocations.start()
+    await replica_router.start()
     print("Pravaah API startup complete.")
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await token_revocations.stop()
+    await replica_router.stop()
     await rabbitmq_service.close()
     print("Pravaah API shutdown complete.")
 
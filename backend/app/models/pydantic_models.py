@@ -1,4 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
+from typing import List
 from uuid import UUID
 from datetime import datetime
 
@@ -23,6 +24,12 @@ class UserRead(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
+    # Access token lifetime in seconds
+    expires_in: int | None = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class ReportCreate(BaseModel):
     user_hazard_type: HazardType
@@ -33,6 +40,53 @@ class ReportCreate(BaseModel):
 class ReportSubmitResponse(BaseModel):
     message: str
     report_id: UUID
+    # "low" when accepted while report processing is backed up
+    priority: str = "normal"
+
+class ReportBatchItem(ReportCreate):
+    """
+    One queued report. The client generates report_id, so re-sending a batch after a
+    lost response does not create the report twice.
+    """
+    report_id: UUID
+    media_keys: List[str] = Field([], max_length=10)
+
+class ReportBatchSubmitRequest(BaseModel):
+    reports: List[ReportBatchItem] = Field(..., min_length=1, max_length=50)
+
+class ReportBatchResult(BaseModel):
+    report_id: UUID
+    # accepted, duplicate (already accepted earlier), rejected (fix and re-send) or failed (retry)
+    status: str
+    detail: str | None = None
+
+class ReportBatchSubmitResponse(BaseModel):
+    results: List[ReportBatchResult]
+    priority: str = "normal"
+
+class MediaPresignFile(BaseModel):
+    filename: str
+    content_type: str = Field(..., example="image/jpeg")
+    sha256: str | None = Field(None, pattern="^[0-9a-f]{64}$", description="Hex SHA-256 of the file, to skip uploading known content")
+
+class MediaPresignRequest(BaseModel):
+    """
+    Files a client wants to upload directly to object storage for one report.
+    """
+    report_id: UUID | None = None
+    files: List[MediaPresignFile] = Field(..., min_length=1, max_length=10)
+
+class MediaPresignUpload(BaseModel):
+    key: str
+    media_type: str
+    url: str | None = None
+    method: str | None = None
+    headers: dict = {}
+    existing: bool = False
+
+class MediaPresignResponse(BaseModel):
+    report_id: UUID
+    uploads: List[MediaPresignUpload]
 
 class VerificationCreate(BaseModel):
     """
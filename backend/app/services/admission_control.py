@@ -0,0 +1,135 @@
+import asyncio
+import math
+import time
+import uuid
+from collections import OrderedDict
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.metrics import metrics
+from app.services.rabbitmq_service import rabbitmq_service
+
+REPORT_QUEUE = "report_processing_queue"
+# Accepted while the coordinator is behind; drained only when REPORT_QUEUE is empty
+LOW_PRIORITY_REPORT_QUEUE = "report_processing_low_priority_queue"
+# Per-user buckets kept in memory; the least recently used are forgotten past this
+MAX_USER_BUCKETS = 100_000
+
+rate_limited = metrics.counter("submit_rate_limited_total", "Report submissions refused by a rate limit (429/503)")
+shed = metrics.counter("submit_shed_total", "Report submissions refused because the report queue is too deep (503)")
+low_priority = metrics.counter("submit_low_priority_total", "Reports accepted onto the low-priority queue")
+
+class TokenBucket:
+    """Allows 'rate' tokens per second on average, with bursts of up to 'burst'."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, count: int = 1) -> float:
+        """Seconds until 'count' tokens are available (0 if they are now)."""
+        self._refill()
+        if self.tokens >= count:
+            return 0.0
+        if count > self.burst or self.rate <= 0:
+            return math.inf
+        return (count - self.tokens) / self.rate
+
+    def take(self, count: int = 1):
+        self._refill()
+        self.tokens -= count
+
+
+class AdmissionController:
+    """
+    Decides whether report submissions are accepted, in this order:
+    - report_processing_queue deeper than the reject watermark: 503 with Retry-After;
+    - user or process over its token bucket: 429 / 503 with Retry-After;
+    - queue deeper than the low-priority watermark: accepted onto the low-priority queue;
+    - otherwise accepted onto report_processing_queue.
+    Queue depth is read with a passive declare at most every QUEUE_DEPTH_CHECK_SECONDS.
+    Buckets are per API process, so the global rate scales with the number of processes.
+    """
+
+    def __init__(self):
+        self.user_buckets: "OrderedDict[uuid.UUID, TokenBucket]" = OrderedDict()
+        self.global_bucket = TokenBucket(settings.SUBMIT_RATE_GLOBAL, settings.SUBMIT_BURST_GLOBAL)
+        self.queue_depth: int | None = None
+        self.depth_checked_at = 0.0
+        self.depth_lock = asyncio.Lock()
+
+    def _user_bucket(self, user_id: uuid.UUID) -> TokenBucket:
+        bucket = self.user_buckets.get(user_id)
+        if bucket is None:
+            bucket = TokenBucket(settings.SUBMIT_RATE_PER_USER, settings.SUBMIT_BURST_PER_USER)
+            self.user_buckets[user_id] = bucket
+            if len(self.user_buckets) > MAX_USER_BUCKETS:
+                self.user_buckets.popitem(last=False)
+        else:
+            self.user_buckets.move_to_end(user_id)
+        return bucket
+
+    async def current_queue_depth(self) -> int | None:
+        """Cached depth of report_processing_queue; one broker call per refresh across requests."""
+        if time.monotonic() - self.depth_checked_at < settings.QUEUE_DEPTH_CHECK_SECONDS:
+            return self.queue_depth
+        async with self.depth_lock:
+            if time.monotonic() - self.depth_checked_at >= settings.QUEUE_DEPTH_CHECK_SECONDS:
+                self.queue_depth = await rabbitmq_service.queue_depth(REPORT_QUEUE)
+                self.depth_checked_at = time.monotonic()
+        return self.queue_depth
+
+    def _retry_after(self, seconds: float) -> dict:
+        if math.isinf(seconds):
+            seconds = settings.SUBMIT_RETRY_AFTER_SECONDS
+        return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+    async def admit(self, user_id: uuid.UUID, count: int = 1) -> str:
+        """
+        Admits 'count' reports from a user, returning the queue to publish them to,
+        or raises HTTPException (429 or 503) with a Retry-After header.
+        """
+        depth = await self.current_queue_depth()
+        if depth is not None and depth >= settings.QUEUE_REJECT_WATERMARK:
+            shed.inc()
+            raise HTTPException(
+                status_code=503,
+                detail="Report processing is overloaded; please retry later.",
+                headers=self._retry_after(settings.SUBMIT_RETRY_AFTER_SECONDS)
+            )
+
+        user_bucket = self._user_bucket(user_id)
+        user_wait = user_bucket.wait_time(count)
+        if user_wait > 0:
+            rate_limited.inc()
+            raise HTTPException(
+                status_code=429,
+                detail="Too many reports submitted; please retry later.",
+                headers=self._retry_after(user_wait)
+            )
+        global_wait = self.global_bucket.wait_time(count)
+        if global_wait > 0:
+            rate_limited.inc()
+            raise HTTPException(
+                status_code=503,
+                detail="Too many reports are being submitted; please retry later.",
+                headers=self._retry_after(global_wait)
+            )
+        user_bucket.take(count)
+        self.global_bucket.take(count)
+
+        if depth is not None and depth >= settings.QUEUE_LOW_PRIORITY_WATERMARK:
+            low_priority.inc(count)
+            return LOW_PRIORITY_REPORT_QUEUE
+        return REPORT_QUEUE
+
+admission_controller = AdmissionController()
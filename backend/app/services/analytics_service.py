@@ -0,0 +1,119 @@
+import asyncio
+import glob
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import duckdb
+
+from app.core.config import settings
+
+ARCHIVE_TABLES = ("reports", "verifications", "media")
+TREND_INTERVALS = ("day", "week", "month", "quarter", "year")
+
+TRENDS_QUERY = """
+    SELECT
+        CAST(date_trunc('{interval}', created_at) AS DATE) AS period,
+        hazard_type,
+        count(*) AS reports,
+        count(*) FILTER (WHERE status = 'verified') AS verified,
+        count(*) FILTER (WHERE status = 'rejected') AS rejected,
+        avg(final_confidence_score) AS avg_confidence
+    FROM reports
+    WHERE {where}
+    GROUP BY ALL
+    ORDER BY period, hazard_type
+"""
+
+def _naive_utc(value: datetime) -> datetime:
+    """Archive timestamps are UTC without a time zone; naive inputs are taken as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class AnalyticsService:
+    """
+    Read-only analytics over the Parquet archive written by export_archive.py, using
+    DuckDB; Postgres is never queried. Each table of the archive is exposed as a view
+    of the same name, with the year/month directory levels as extra columns (filters
+    on them skip whole files). Timestamps are UTC. Queries run in threads, at most
+    ANALYTICS_MAX_CONCURRENT_QUERIES at a time per process.
+    """
+
+    def __init__(self, archive_dir: str):
+        self.archive_dir = archive_dir
+        self.semaphore = asyncio.Semaphore(settings.ANALYTICS_MAX_CONCURRENT_QUERIES)
+
+    def _files(self, table: str) -> str:
+        return os.path.join(self.archive_dir, table, "*", "*", "*.parquet")
+
+    def available_tables(self) -> List[str]:
+        return [table for table in ARCHIVE_TABLES if glob.glob(self._files(table))]
+
+    def connect(self) -> duckdb.DuckDBPyConnection:
+        """In-memory DuckDB connection with a view per archived table."""
+        conn = duckdb.connect(config={"threads": settings.ANALYTICS_THREADS})
+        for table in self.available_tables():
+            path = self._files(table).replace("'", "''")
+            conn.execute(
+                f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{path}', hive_partitioning = true)"
+            )
+        return conn
+
+    def run_query(self, sql: str, params: Sequence[Any] = ()) -> Dict[str, Any]:
+        """Run a query synchronously; returns {"columns": [...], "rows": [[...], ...]}."""
+        conn = self.connect()
+        try:
+            cursor = conn.execute(sql, list(params))
+            columns = [column[0] for column in cursor.description]
+            return {"columns": columns, "rows": [list(row) for row in cursor.fetchall()]}
+        finally:
+            conn.close()
+
+    async def query(self, sql: str, params: Sequence[Any] = ()) -> Dict[str, Any]:
+        async with self.semaphore:
+            return await asyncio.to_thread(self.run_query, sql, params)
+
+    async def archived_months(self) -> List[str]:
+        """Months present in the archive, as 'YYYY-MM'."""
+        if "reports" not in self.available_tables():
+            return []
+        result = await self.query(
+            "SELECT DISTINCT year, month FROM reports ORDER BY year, month"
+        )
+        return [f"{year}-{int(month):02d}" for year, month in result["rows"]]
+
+    async def report_trends(
+        self,
+        interval: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        hazard_types: Sequence[str] = (),
+        statuses: Sequence[str] = ()
+    ) -> List[Dict[str, Any]]:
+        """Report counts, outcomes and mean confidence per period and hazard type."""
+        if interval not in TREND_INTERVALS:
+            raise ValueError(f"interval must be one of {', '.join(TREND_INTERVALS)}")
+        if "reports" not in self.available_tables():
+            return []
+
+        clauses, params = ["true"], []
+        if since is not None:
+            # The year bound lets DuckDB skip the files of earlier years outright
+            clauses.append("year >= ? AND created_at >= ?")
+            params += [since.year, _naive_utc(since)]
+        if until is not None:
+            clauses.append("year <= ? AND created_at < ?")
+            params += [until.year, _naive_utc(until)]
+        if hazard_types:
+            clauses.append(f"hazard_type IN ({', '.join('?' * len(hazard_types))})")
+            params += list(hazard_types)
+        if statuses:
+            clauses.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params += list(statuses)
+
+        result = await self.query(TRENDS_QUERY.format(interval=interval, where=" AND ".join(clauses)), params)
+        return [dict(zip(result["columns"], row)) for row in result["rows"]]
+
+# Global instance
+analytics_service = AnalyticsService(settings.ARCHIVE_DIR)
@@ -1,10 +1,14 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from app.db.models import Verification, VerificationSource
 
 class ConfidenceCalculator:
     """
     Calculates confidence scores based on verification results from multiple sources.
     """
+
+    # A report scoring at least this is verified, and one scoring below REJECT_BELOW is rejected
+    VERIFY_AT = 0.8
+    REJECT_BELOW = 0.4
     
     def __init__(self):
         self.weights = {
@@ -28,16 +32,10 @@ class ConfidenceCalculator:
             source = verification.source
             result_data = verification.result_data
             
-            if source == VerificationSource.weather_api:
-                score, reason = self._analyze_weather_result(result_data)
-            elif source == VerificationSource.nlp_pipeline:
-                score, reason = self._analyze_nlp_result(result_data)
-            elif source == VerificationSource.peer_report:
-                score, reason = self._analyze_peer_result(result_data)
-            else:
+            scored = self.score_verification(source, result_data)
+            if scored is None:
                 continue
-            
-            weight = self.weights.get(source, 0.0)
+            score, weight, reason = scored
             total_score += score * weight
             total_weight += weight
             
@@ -52,7 +50,7 @@ class ConfidenceCalculator:
             return {"confidence_score": 0.0, "reason": "No valid verifications"}
         
         final_score = total_score / total_weight
-        confidence_level = self._get_confidence_level(final_score)
+        confidence_level = self.get_confidence_level(final_score)
         
         return {
             "confidence_score": round(final_score, 2),
@@ -62,6 +60,21 @@ class ConfidenceCalculator:
             "calculation_method": "weighted_average"
         }
     
+    def score_verification(self, source: VerificationSource, result_data: Dict) -> Optional[Tuple[float, float, str]]:
+        """
+        Score a single verification: returns (score, weight, reason), or None for an
+        unknown source. The report's confidence is sum(score * weight) / sum(weight).
+        """
+        if source == VerificationSource.weather_api:
+            score, reason = self._analyze_weather_result(result_data)
+        elif source == VerificationSource.nlp_pipeline:
+            score, reason = self._analyze_nlp_result(result_data)
+        elif source == VerificationSource.peer_report:
+            score, reason = self._analyze_peer_result(result_data)
+        else:
+            return None
+        return score, self.weights.get(source, 0.0), reason
+    
     def _analyze_weather_result(self, result_data: Dict) -> tuple[float, str]:
         """Analyze weather verification result."""
         if "error" in result_data:
@@ -102,13 +115,13 @@ class ConfidenceCalculator:
         # Placeholder for peer verification logic
         return 0.5, "Peer verification pending implementation"
     
-    def _get_confidence_level(self, score: float) -> str:
+    def get_confidence_level(self, score: float) -> str:
         """Convert numeric score to confidence level."""
-        if score >= 0.8:
+        if score >= self.VERIFY_AT:
             return "High"
         elif score >= 0.6:
             return "Medium"
-        elif score >= 0.4:
+        elif score >= self.REJECT_BELOW:
             return "Low"
         else:
             return "Very Low"
@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import read_session, replica_staleness
+
+Compute = Callable[[AsyncSession], Awaitable[Any]]
+
+class HotspotCache:
+    """
+    In-process cache of serialized hotspot responses keyed by filter parameters.
+    Every entry is tagged with the report version it was built from; the version is
+    bumped on each report event, which makes all older entries stale at once.
+    Concurrent misses for the same key and version share a single query
+    (single-flight), run in a read session of its own so that no request's session
+    is needed once that request is gone.
+    An entry built from a lagging read replica shortly after a bump may predate the
+    change behind it, so it is rebuilt once the lag has passed. Report events are
+    transient, so every entry is also rebuilt after max_age seconds, which bounds
+    how long a missed event (e.g. during a RabbitMQ reconnect) can keep it stale.
+    """
+
+    def __init__(self, max_entries: int, max_age: float):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.version = 0
+        self.bumped_at = 0.0
+        # key -> (version, body, etag, rebuild_after)
+        self.entries: "OrderedDict[Hashable, Tuple[int, bytes, str, float]]" = OrderedDict()
+        # (key, version) -> task building that entry
+        self.inflight: Dict[Tuple[Hashable, int], asyncio.Task] = {}
+
+    def bump_version(self):
+        """Mark every cached response as stale."""
+        self.version += 1
+        self.bumped_at = time.monotonic()
+
+    async def on_report_event(self, event: Dict[str, Any]):
+        """Report event listener: any created or re-scored report changes the hotspots."""
+        self.bump_version()
+
+    async def get_or_compute(self, key: Hashable, compute: Compute) -> Tuple[bytes, str]:
+        """
+        Return (json_body, etag) for the key, running compute(session) only when there
+        is no entry for the current version and no identical query already in flight.
+        A query started before the last bump is not joined, as it may miss the change.
+        """
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == self.version and time.monotonic() < entry[3]:
+            self.entries.move_to_end(key)
+            return entry[1], entry[2]
+
+        flight = (key, self.version)
+        task = self.inflight.get(flight)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, self.version, compute))
+            self.inflight[flight] = task
+        # Shield so a disconnecting client does not cancel the query other requests wait on
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: Hashable, version: int, compute: Compute) -> Tuple[bytes, str]:
+        started = time.monotonic()
+        try:
+            async with read_session() as db:
+                staleness = replica_staleness(db)
+                payload = await compute(db)
+            body = json.dumps(payload).encode()
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+            # Tag with the version seen before querying, so a bump during the query
+            # leaves the entry stale rather than hiding the change
+            # Data as of 'started - staleness' may miss a bump made since; rebuild once it cannot
+            rebuild_after = started + self.max_age
+            if staleness and self.bumped_at >= started - staleness:
+                rebuild_after = min(rebuild_after, started + staleness)
+            self.entries[key] = (version, body, etag, rebuild_after)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            return body, etag
+        finally:
+            self.inflight.pop((key, version), None)
+
+# Global instance
+hotspot_cache = HotspotCache(settings.HOTSPOT_CACHE_MAX_ENTRIES, settings.HOTSPOT_CACHE_MAX_AGE_SECONDS)
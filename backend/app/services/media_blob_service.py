@@ -0,0 +1,147 @@
+import asyncio
+import uuid
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from fastapi import UploadFile
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.models import MediaBlob, MediaBlobOwner, MediaType
+from app.services.metrics import metrics
+from app.services.s3_service import s3_service, READ_CHUNK_BYTES
+
+dedup_hits = metrics.counter("media_dedup_hits_total", "Uploads that reused an already stored object")
+dedup_misses = metrics.counter("media_dedup_misses_total", "Uploads stored as a new object")
+
+class MediaBlobService:
+    """
+    Content-addressed registry of stored media. Every distinct file (by SHA-256) is
+    stored once; later uploads of the same bytes point at the existing object.
+    Lookups on behalf of a client that only names content (a declared hash, or an
+    object key) pass owner_id, and match only blobs that user has uploaded.
+    """
+
+    def media_payload(self, file_url: str, media_type: str, content_hash: str, duplicate: bool) -> Dict:
+        """
+        Media entry of a report message. 'duplicate' tells downstream workers that the
+        content was seen before, so results keyed by content_hash can be reused.
+        """
+        return {
+            "file_url": file_url,
+            "media_type": media_type,
+            "content_hash": content_hash,
+            "duplicate": duplicate
+        }
+
+    async def find_by_hashes(
+        self, db: AsyncSession, content_hashes: List[str], owner_id: Optional[uuid.UUID] = None
+    ) -> Dict[str, MediaBlob]:
+        """Returns the stored blobs among the given content hashes (only owner_id's, if given)."""
+        if not content_hashes:
+            return {}
+        query = self._owned(select(MediaBlob), owner_id).where(MediaBlob.content_hash.in_(set(content_hashes)))
+        result = await db.execute(query)
+        return {blob.content_hash: blob for blob in result.scalars().all()}
+
+    async def find_by_keys(
+        self, db: AsyncSession, s3_keys: List[str], owner_id: Optional[uuid.UUID] = None
+    ) -> Dict[str, MediaBlob]:
+        """Returns the stored blobs among the given object keys (only owner_id's, if given)."""
+        if not s3_keys:
+            return {}
+        query = self._owned(select(MediaBlob), owner_id).where(MediaBlob.s3_key.in_(set(s3_keys)))
+        result = await db.execute(query)
+        return {blob.s3_key: blob for blob in result.scalars().all()}
+
+    def _owned(self, query, owner_id: Optional[uuid.UUID]):
+        if owner_id is None:
+            return query
+        return query.join(MediaBlobOwner, MediaBlobOwner.content_hash == MediaBlob.content_hash).where(
+            MediaBlobOwner.user_id == owner_id
+        )
+
+    async def is_known(self, db: AsyncSession, content_hash: str) -> bool:
+        return content_hash in await self.find_by_hashes(db, [content_hash])
+
+    async def register(self, db: AsyncSession, blobs: List[Dict], owner_id: uuid.UUID):
+        """
+        Records objects newly stored by owner_id. If the same content was stored
+        concurrently by another upload, the first registration wins and this object
+        is simply not reused; owner_id still owns the content.
+        """
+        if not blobs:
+            return
+        rows = [{**blob, "media_type": MediaType(blob["media_type"])} for blob in blobs]
+        await db.execute(insert(MediaBlob).values(rows).on_conflict_do_nothing())
+        await self.add_owner(db, [blob["content_hash"] for blob in blobs], owner_id)
+
+    async def add_owner(self, db: AsyncSession, content_hashes: Iterable[str], owner_id: uuid.UUID):
+        """Records that owner_id has uploaded these (already registered) contents."""
+        rows = [{"content_hash": content_hash, "user_id": owner_id} for content_hash in set(content_hashes)]
+        if rows:
+            await db.execute(insert(MediaBlobOwner).values(rows).on_conflict_do_nothing())
+        await db.commit()
+
+    async def store_uploads(
+        self, db: AsyncSession, uploads: List[Tuple[UploadFile, str]], user_id: uuid.UUID, report_id: uuid.UUID
+    ) -> List[Dict]:
+        """
+        Stores (file, media_type) pairs of a user's report and returns their media payloads in order.
+        Files are streamed to the store in parallel and hashed as they stream; content
+        that is already stored (or stored by another file of the same report) is not kept.
+        """
+        if not uploads:
+            return []
+
+        # The session is shared by the parallel uploads, so they take turns using it
+        db_lock = asyncio.Lock()
+        claimed: Set[str] = set()
+
+        async def is_known(content_hash: str) -> bool:
+            if content_hash in claimed:
+                return True
+            claimed.add(content_hash)
+            async with db_lock:
+                return await self.is_known(db, content_hash)
+
+        async def store(file: UploadFile, media_type: str) -> Tuple[str, int, str, bool]:
+            s3_key = s3_service.build_key(media_type, user_id, report_id, file.filename)
+            size, content_hash, stored = await s3_service.stream_upload(
+                _read_chunks(file), s3_key, file.content_type, file.size, is_known=is_known
+            )
+            return s3_key, size, content_hash, stored
+
+        results = await asyncio.gather(*(store(file, media_type) for file, media_type in uploads))
+
+        new_blobs: Dict[str, Dict] = {}
+        for (_, media_type), (s3_key, size, content_hash, stored) in zip(uploads, results):
+            if stored:
+                new_blobs[content_hash] = {
+                    "content_hash": content_hash,
+                    "s3_key": s3_key,
+                    "file_url": s3_service.object_url(s3_key),
+                    "media_type": media_type,
+                    "size_bytes": size
+                }
+        await self.register(db, list(new_blobs.values()), user_id)
+        # The uploader has sent the bytes, so it may attach already stored content
+        known = await self.find_by_hashes(db, [r[2] for r in results if r[2] not in new_blobs])
+        await self.add_owner(db, known, user_id)
+
+        payloads = []
+        for (_, media_type), (_, _, content_hash, _) in zip(uploads, results):
+            if content_hash in known:
+                dedup_hits.inc()
+                payloads.append(self.media_payload(known[content_hash].file_url, media_type, content_hash, True))
+            else:
+                dedup_misses.inc()
+                payloads.append(self.media_payload(new_blobs[content_hash]["file_url"], media_type, content_hash, False))
+        return payloads
+
+
+async def _read_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    await file.seek(0)
+    while chunk := await file.read(READ_CHUNK_BYTES):
+        yield chunk
+
+media_blob_service = MediaBlobService()
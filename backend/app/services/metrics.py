@@ -0,0 +1,130 @@
+import bisect
+import threading
+from typing import Dict, Optional, Sequence
+
+# Latency buckets in seconds, from 5ms to 60s
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Percentiles are estimated from the bucket bounds,
+    which is precise enough to compare latency before and after a change.
+    """
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        # One extra slot for observations above the largest bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of observations."""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict:
+        return {
+            "type": "histogram",
+            "description": self.description,
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets": {str(bound): c for bound, c in zip(self.buckets, self.counts)},
+            "overflow": self.counts[-1],
+        }
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> Dict:
+        return {"type": "counter", "description": self.description, "value": self.value}
+
+
+class Gauge:
+    """Value that can go up and down, such as the number of connections in use."""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self.value -= amount
+
+    def snapshot(self) -> Dict:
+        return {"type": "gauge", "description": self.description, "value": self.value}
+
+
+class MetricsRegistry:
+    """
+    Process-wide registry of named metrics, exposed as JSON on /api/metrics.
+    Metrics are created on first use, so modules can declare them at import time.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, description, buckets))
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, description))
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        return self._get_or_create(name, lambda: Gauge(name, description))
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: metric.snapshot() for name, metric in sorted(self.metrics.items())}
+
+    def _get_or_create(self, name: str, factory):
+        with self._lock:
+            if name not in self.metrics:
+                self.metrics[name] = factory()
+            return self.metrics[name]
+
+# Global instance
+metrics = MetricsRegistry()
@@ -1,35 +1,48 @@
+import asyncio
 import aio_pika
 import json
 from app.core.config import settings
-from typing import Callable, Coroutine, Any
+from typing import Callable, Coroutine, Any, Dict, List, Optional
 
 class RabbitMQService:
     def __init__(self):
         self.connection: aio_pika.abc.AbstractRobustConnection | None = None
         self.channel: aio_pika.abc.AbstractChannel | None = None
+        # Queues already declared on this connection, so publishing skips the round trip
+        self.declared_queues: Dict[str, aio_pika.abc.AbstractQueue] = {}
+        # Separate channel for passive declares: one on a missing queue closes its channel
+        self.inspect_channel: aio_pika.abc.AbstractChannel | None = None
 
-    async def connect(self):
+    async def connect(self, prefetch_count: int = 1):
+        """Connect and open the main channel; prefetch_count bounds unacked deliveries to consumers."""
         try:
             self.connection = await aio_pika.connect_robust(settings.RABBITMQ_URL)
             self.channel = await self.connection.channel()
-            await self.channel.set_qos(prefetch_count=1)
+            await self.channel.set_qos(prefetch_count=prefetch_count)
             print("Successfully connected to RabbitMQ.")
         except Exception as e:
             print(f"Failed to connect to RabbitMQ: {e}")
             raise
 
     async def close(self):
+        if self.inspect_channel and not self.inspect_channel.is_closed:
+            await self.inspect_channel.close()
         if self.channel:
             await self.channel.close()
         if self.connection:
             await self.connection.close()
         print("RabbitMQ connection closed.")
 
+    async def _ensure_queue(self, queue_name: str) -> aio_pika.abc.AbstractQueue:
+        if queue_name not in self.declared_queues:
+            self.declared_queues[queue_name] = await self.channel.declare_queue(queue_name, durable=True)
+        return self.declared_queues[queue_name]
+
     async def publish_message(self, queue_name: str, message_body: dict):
         if not self.channel:
             raise ConnectionError("RabbitMQ channel is not available.")
         
-        await self.channel.declare_queue(queue_name, durable=True)
+        await self._ensure_queue(queue_name)
 
         message = aio_pika.Message(
             body=json.dumps(message_body).encode(),
@@ -37,6 +50,82 @@ class RabbitMQService:
         )
         await self.channel.default_exchange.publish(message, routing_key=queue_name)
 
+    async def publish_messages(self, queue_name: str, message_bodies: List[dict]) -> List[Optional[Exception]]:
+        """
+        Publish several persistent messages at once. All publishes are in flight together,
+        so their publisher confirms come back in about one round trip instead of one each.
+        Returns, per message, None if the broker confirmed it or the error if not.
+        """
+        if not self.channel:
+            raise ConnectionError("RabbitMQ channel is not available.")
+
+        await self._ensure_queue(queue_name)
+
+        results = await asyncio.gather(
+            *(
+                self.channel.default_exchange.publish(
+                    aio_pika.Message(body=json.dumps(body).encode(), delivery_mode=aio_pika.DeliveryMode.PERSISTENT),
+                    routing_key=queue_name
+                )
+                for body in message_bodies
+            ),
+            return_exceptions=True
+        )
+        return [result if isinstance(result, BaseException) else None for result in results]
+
+    async def queue_depth(self, queue_name: str) -> int | None:
+        """
+        Number of ready messages in a queue, read with a passive declare.
+        Returns None if the queue does not exist yet or the broker cannot be asked.
+        """
+        if not self.connection:
+            raise ConnectionError("RabbitMQ connection is not available.")
+
+        try:
+            if self.inspect_channel is None or self.inspect_channel.is_closed:
+                self.inspect_channel = await self.connection.channel(publisher_confirms=False)
+            queue = await self.inspect_channel.declare_queue(queue_name, passive=True)
+            return queue.declaration_result.message_count
+        except Exception as e:
+            print(f"Could not read depth of queue {queue_name}: {e}")
+            self.inspect_channel = None
+            return None
+
+    async def publish_event(self, exchange_name: str, message_body: dict):
+        """Broadcast a transient message to every subscriber of a fanout exchange."""
+        if not self.channel:
+            raise ConnectionError("RabbitMQ channel is not available.")
+
+        exchange = await self.channel.declare_exchange(exchange_name, aio_pika.ExchangeType.FANOUT)
+
+        message = aio_pika.Message(body=json.dumps(message_body).encode())
+        await exchange.publish(message, routing_key="")
+
+    async def subscribe_events(
+        self,
+        exchange_name: str,
+        callback: Callable[[aio_pika.abc.AbstractIncomingMessage], Coroutine[Any, Any, None]]
+    ):
+        """Receive every message broadcast on a fanout exchange through a private queue."""
+        if not self.channel:
+            raise ConnectionError("RabbitMQ channel is not available.")
+
+        exchange = await self.channel.declare_exchange(exchange_name, aio_pika.ExchangeType.FANOUT)
+        queue = await self.channel.declare_queue(exclusive=True, auto_delete=True)
+        await queue.bind(exchange)
+
+        # Events are fire-and-forget, so skip acks (and the channel's prefetch limit)
+        await queue.consume(callback, no_ack=True)
+        print(f"[*] Subscribed to events on exchange: {exchange_name}")
+
+    async def get_message(self, queue_name: str) -> aio_pika.abc.AbstractIncomingMessage | None:
+        """Fetch one message from a durable queue without subscribing to it, or None if it is empty."""
+        if not self.channel:
+            raise ConnectionError("RabbitMQ channel is not available.")
+
+        queue = await self._ensure_queue(queue_name)
+        return await queue.get(fail=False)
+
     async def consume_messages(
         self,
         queue_name: str,
@@ -0,0 +1,101 @@
+import json
+from typing import Callable, Coroutine, Any, Dict, List, Optional
+from aio_pika.abc import AbstractIncomingMessage
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.models import Report, report_point
+from app.services.rabbitmq_service import rabbitmq_service
+
+ReportEventListener = Callable[[Dict[str, Any]], Coroutine[Any, Any, None]]
+
+class ReportEventService:
+    """
+    Broadcasts report changes (new reports, re-scored reports) to every API process.
+    The coordinator worker and the API both publish; API processes subscribe and
+    hand each event to the registered listeners (caches, streams, ...).
+    """
+
+    EXCHANGE_NAME = "report_events"
+
+    def __init__(self):
+        self.listeners: List[ReportEventListener] = []
+
+    def add_listener(self, listener: ReportEventListener):
+        """Register a coroutine to be called with every received report event."""
+        self.listeners.append(listener)
+
+    async def start(self):
+        """Subscribe this process to the report events exchange."""
+        await rabbitmq_service.subscribe_events(self.EXCHANGE_NAME, self._on_message)
+
+    async def publish(
+        self,
+        event_type: str,
+        report_id: str,
+        latitude: float,
+        longitude: float,
+        hazard_type: Optional[str] = None,
+        status: Optional[str] = None,
+        confidence: Optional[float] = None
+    ):
+        """
+        Publish a report event. Failures are logged and swallowed so that a
+        broken broadcast never fails the write that triggered it.
+        """
+        event = {
+            "type": event_type,
+            "report_id": str(report_id),
+            "latitude": latitude,
+            "longitude": longitude,
+            "hazard_type": hazard_type,
+            "status": status,
+            "confidence": confidence,
+        }
+        try:
+            await rabbitmq_service.publish_event(self.EXCHANGE_NAME, event)
+        except Exception as e:
+            print(f"[ReportEvents] Failed to publish {event_type} for report {report_id}: {e}")
+
+    async def publish_report(self, event_type: str, report: Report, db: AsyncSession):
+        """Publish an event for a report already in the database, looking up its coordinates."""
+        try:
+            result = await db.execute(
+                select(func.ST_Y(report_point), func.ST_X(report_point)).where(Report.id == report.id, Report.created_at == report.created_at)
+            )
+            latitude, longitude = result.one()
+        except Exception as e:
+            print(f"[ReportEvents] Could not locate report {report.id} for {event_type}: {e}")
+            return
+
+        await self.publish(
+            event_type,
+            report.id,
+            latitude,
+            longitude,
+            hazard_type=_enum_value(report.user_hazard_type),
+            status=_enum_value(report.status),
+            confidence=report.final_confidence_score
+        )
+
+    async def _on_message(self, message: AbstractIncomingMessage):
+        try:
+            event = json.loads(message.body.decode())
+        except Exception as e:
+            print(f"[ReportEvents] Dropping malformed event: {e}")
+            return
+
+        for listener in self.listeners:
+            try:
+                await listener(event)
+            except Exception as e:
+                print(f"[ReportEvents] Listener failed for {event.get('type')} event: {e}")
+
+def _enum_value(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return value.value if hasattr(value, 'value') else str(value)
+
+# Global instance
+report_events = ReportEventService()
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import math
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+
+# Bounding box as (min_lat, min_lng, max_lat, max_lng)
+BBox = Tuple[float, float, float, float]
+
+class StreamSubscription:
+    """One connected stream client: its filters and its bounded outgoing queue."""
+
+    __slots__ = ("queue", "bbox", "hazard_types", "cells", "closed")
+
+    def __init__(self, bbox: Optional[BBox], hazard_types: Set[str], queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.bbox = bbox
+        self.hazard_types = hazard_types
+        self.cells: list = []
+        self.closed = False
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.hazard_types and event.get("hazard_type") not in self.hazard_types:
+            return False
+        if self.bbox is not None:
+            min_lat, min_lng, max_lat, max_lng = self.bbox
+            lat, lng = event.get("latitude"), event.get("longitude")
+            if lat is None or lng is None:
+                return False
+            if not (min_lat <= lat <= max_lat and min_lng <= lng <= max_lng):
+                return False
+        return True
+
+
+class ReportStreamService:
+    """
+    Fans report events out to connected Server-Sent Events clients.
+    Each event is serialized once and the same bytes are queued for every match.
+    Subscribers with a small bounding box are indexed by coarse grid cell so an
+    event only visits the clients whose area can contain it; clients that fall
+    too far behind are disconnected rather than buffered without bound.
+    """
+
+    GRID_DEGREES = 1.0
+    MAX_CELLS_PER_SUBSCRIPTION = 64
+
+    def __init__(self, max_subscribers: int, queue_size: int):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.subscriber_count = 0
+        # Subscribers with no bbox, or one too large to index by cell
+        self.unindexed: Set[StreamSubscription] = set()
+        self.cells: Dict[Tuple[int, int], Set[StreamSubscription]] = {}
+
+    def subscribe(self, bbox: Optional[BBox], hazard_types: Set[str]) -> Optional[StreamSubscription]:
+        """Register a client; returns None when this process is at its subscriber limit."""
+        if self.subscriber_count >= self.max_subscribers:
+            return None
+
+        subscription = StreamSubscription(bbox, hazard_types, self.queue_size)
+        cells = self._cells_for_bbox(bbox) if bbox is not None else None
+        if cells is None:
+            self.unindexed.add(subscription)
+        else:
+            subscription.cells = cells
+            for cell in cells:
+                self.cells.setdefault(cell, set()).add(subscription)
+
+        self.subscriber_count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: StreamSubscription):
+        if subscription.closed:
+            return
+        subscription.closed = True
+        self.subscriber_count -= 1
+        self.unindexed.discard(subscription)
+        for cell in subscription.cells:
+            members = self.cells.get(cell)
+            if members is not None:
+                members.discard(subscription)
+                if not members:
+                    del self.cells[cell]
+
+    async def on_report_event(self, event: Dict[str, Any]):
+        """Report event listener: queue the event for every matching subscriber."""
+        if not self.subscriber_count:
+            return
+
+        payload = f"event: {event.get('type', 'message')}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n".encode()
+
+        candidates = self.unindexed
+        lat, lng = event.get("latitude"), event.get("longitude")
+        if lat is not None and lng is not None:
+            cell_members = self.cells.get(self._cell(lat, lng))
+            if cell_members:
+                candidates = candidates | cell_members
+
+        # Dropped after the loop: unsubscribing changes the sets being iterated
+        lagging = []
+        for subscription in candidates:
+            if not subscription.matches(event):
+                continue
+            try:
+                subscription.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                lagging.append(subscription)
+
+        for subscription in lagging:
+            print("[ReportStream] Dropping a subscriber that fell too far behind")
+            self.unsubscribe(subscription)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.GRID_DEGREES), math.floor(lng / self.GRID_DEGREES))
+
+    def _cells_for_bbox(self, bbox: BBox) -> Optional[list]:
+        min_lat, min_lng, max_lat, max_lng = bbox
+        lat0, lng0 = self._cell(min_lat, min_lng)
+        lat1, lng1 = self._cell(max_lat, max_lng)
+        if (lat1 - lat0 + 1) * (lng1 - lng0 + 1) > self.MAX_CELLS_PER_SUBSCRIPTION:
+            return None
+        return [(a, b) for a in range(lat0, lat1 + 1) for b in range(lng0, lng1 + 1)]
+
+# Global instance
+report_stream = ReportStreamService(settings.STREAM_MAX_SUBSCRIBERS, settings.STREAM_QUEUE_SIZE)
@@ -1,55 +1,256 @@
+import asyncio
+import base64
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 import boto3
-from fastapi import UploadFile, HTTPException
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from fastapi import HTTPException
 from app.core.config import settings
+from app.services.metrics import metrics
 import uuid
 
+upload_latency = metrics.histogram("s3_upload_seconds", "Time to upload one media file to S3")
+
+# Object key prefixes per media type, e.g. "images/<user_id>/<report_id>-<uuid>.jpg"
+MEDIA_KEY_PREFIXES = {"image": "images/", "video": "videos/", "audio": "audios/"}
+# Read size when streaming form uploads to the store
+READ_CHUNK_BYTES = 1024 * 1024
+# S3 rejects multipart parts smaller than this, except the last one
+MIN_MULTIPART_PART_BYTES = 5 * 1024 * 1024
+
+def media_type_for_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Map a MIME type to the media type it is stored as, or None if unsupported."""
+    content_type = content_type or ""
+    if content_type.startswith("image/"): return "image"
+    elif content_type.startswith("video/"): return "video"
+    elif content_type.startswith("audio/"): return "audio"
+    return None
+
 class S3Service:
     def __init__(self):
         """
         Initializes the Boto3 S3 client using credentials from the settings.
         """
         try:
+            # A custom endpoint (MinIO, LocalStack, ...) is addressed path-style
             self.s3_client = boto3.client(
                 "s3",
                 aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
                 aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_S3_REGION
+                region_name=settings.AWS_S3_REGION,
+                endpoint_url=settings.AWS_S3_ENDPOINT_URL or None,
+                config=Config(
+                    signature_version="s3v4",
+                    s3={"addressing_style": "path" if settings.AWS_S3_ENDPOINT_URL else "auto"}
+                )
             )
             self.bucket_name = settings.AWS_S3_BUCKET_NAME
+            # boto3 uploads block, so they run here instead of on the event loop.
+            # The pool size bounds how many uploads run at once per API process.
+            self.upload_executor = ThreadPoolExecutor(
+                max_workers=settings.S3_UPLOAD_MAX_CONCURRENCY, thread_name_prefix="s3-upload"
+            )
         except Exception as e:
             print(f"Error initializing S3 client: {e}")
             self.s3_client = None
             self.bucket_name = None
 
-    def upload_file(self, file: UploadFile, media_type: str, report_id: uuid.UUID) -> str:
+    def build_key(self, media_type: str, user_id: uuid.UUID, report_id: uuid.UUID, filename: Optional[str]) -> str:
+        """
+        Generates a unique object key for a report's media file. Keys live under the
+        uploading user's id, so a client-chosen report_id only names keys of that user.
+        """
+        file_extension = "".join(c for c in (filename or "").split('.')[-1] if c.isalnum())[:10] or "bin"
+        unique_filename = f"{report_id}-{uuid.uuid4()}.{file_extension}"
+        return f"{MEDIA_KEY_PREFIXES[media_type]}{user_id}/{unique_filename}"
+
+    def own_key_media_type(self, s3_key: str, user_id: uuid.UUID, report_id: uuid.UUID) -> Optional[str]:
+        """
+        Returns the media type of a key built by build_key for this user and report,
+        or None if the key belongs to another user or report.
+        """
+        for media_type, prefix in MEDIA_KEY_PREFIXES.items():
+            own_prefix = f"{prefix}{user_id}/{report_id}-"
+            if s3_key.startswith(own_prefix) and "/" not in s3_key[len(own_prefix):]:
+                return media_type
+        return None
+
+    def object_url(self, s3_key: str) -> str:
+        """Returns the public URL of an object in the configured bucket."""
+        if settings.AWS_S3_ENDPOINT_URL:
+            return f"{settings.AWS_S3_ENDPOINT_URL.rstrip('/')}/{self.bucket_name}/{s3_key}"
+        return f"https://{self.bucket_name}.s3.{settings.AWS_S3_REGION}.amazonaws.com/{s3_key}"
+
+    def presign_upload(self, s3_key: str, content_type: str, content_hash: Optional[str] = None) -> Dict:
         """
-        Uploads a file to the configured S3 bucket and returns its public URL.
+        Returns a presigned PUT for uploading one object straight to the bucket.
+        The client must send the returned headers with the upload. When the client
+        declared the file's SHA-256, the store rejects a body that does not match it.
+        """
+        if not self.s3_client:
+            raise HTTPException(status_code=500, detail="S3 service is not configured.")
+
+        headers = {"Content-Type": content_type, "x-amz-acl": "public-read"}
+        params = {
+            "Bucket": self.bucket_name,
+            "Key": s3_key,
+            "ContentType": content_type,
+            "ACL": "public-read"
+        }
+        if content_hash:
+            checksum = base64.b64encode(bytes.fromhex(content_hash)).decode()
+            params["ChecksumSHA256"] = checksum
+            headers["x-amz-checksum-sha256"] = checksum
+        url = self.s3_client.generate_presigned_url(
+            "put_object",
+            Params=params,
+            ExpiresIn=settings.S3_PRESIGN_EXPIRE_SECONDS,
+            HttpMethod="PUT"
+        )
+        return {"url": url, "method": "PUT", "headers": headers}
+
+    def head_object(self, s3_key: str) -> Optional[Dict]:
+        """
+        HEADs an uploaded object, returning None if it does not exist. Objects uploaded
+        with a SHA-256 checksum report it as 'content_hash' (hex).
         """
         if not self.s3_client:
             raise HTTPException(status_code=500, detail="S3 service is not configured.")
 
         try:
-            file_extension = file.filename.split('.')[-1]
-            unique_filename = f"{report_id}-{uuid.uuid4()}.{file_extension}"
-            s3_key = f"{media_type}s/{unique_filename}"
+            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key, ChecksumMode="ENABLED")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            print(f"Error checking S3 object {s3_key}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to check uploaded media.")
 
-            extra_args = {'ContentType': file.content_type, 'ACL': 'public-read'}
+        checksum = response.get("ChecksumSHA256")
+        # Multipart checksums are checksums of part checksums ("...-N"), not of the content
+        content_hash = base64.b64decode(checksum).hex() if checksum and "-" not in checksum else None
+        return {"size": response.get("ContentLength", 0), "content_hash": content_hash}
 
-            self.s3_client.upload_fileobj(
-                file.file,
-                self.bucket_name,
-                s3_key,
-                ExtraArgs=extra_args
-            )
+    async def head_objects(self, s3_keys: List[str]) -> List[Optional[Dict]]:
+        """HEADs all keys in parallel on the upload thread pool."""
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            *(loop.run_in_executor(self.upload_executor, self.head_object, key) for key in s3_keys)
+        )
 
-            file_url = f"https://{self.bucket_name}.s3.{settings.AWS_S3_REGION}.amazonaws.com/{s3_key}"
-            
-            print(f"Successfully uploaded {file.filename} to {file_url}")
-            return file_url
+    async def _in_executor(self, call: Callable, **kwargs):
+        """Runs one blocking S3 client call on the upload thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.upload_executor, lambda: call(**kwargs))
 
+    async def create_multipart_upload(self, s3_key: str, content_type: str) -> str:
+        """Starts a multipart upload of a public object and returns its upload id."""
+        response = await self._in_executor(
+            self.s3_client.create_multipart_upload,
+            Bucket=self.bucket_name, Key=s3_key, ContentType=content_type, ACL="public-read"
+        )
+        return response["UploadId"]
+
+    async def upload_part(self, s3_key: str, upload_id: str, part_number: int, data: bytes) -> Dict:
+        """Uploads one part (at least 5 MiB unless it is the last) and returns its entry for completion."""
+        response = await self._in_executor(
+            self.s3_client.upload_part,
+            Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id, PartNumber=part_number, Body=data
+        )
+        return {"ETag": response["ETag"], "PartNumber": part_number}
+
+    async def complete_multipart_upload(self, s3_key: str, upload_id: str, parts: List[Dict]):
+        await self._in_executor(
+            self.s3_client.complete_multipart_upload,
+            Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+        )
+
+    async def abort_multipart_upload(self, s3_key: str, upload_id: str):
+        """Discards a multipart upload and its parts, logging instead of raising on failure."""
+        try:
+            await self._in_executor(
+                self.s3_client.abort_multipart_upload,
+                Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id
+            )
         except Exception as e:
-            print(f"Error uploading file to S3: {e}")
+            print(f"Error aborting multipart upload for {s3_key}: {e}")
+
+    async def stream_upload(
+        self, chunks: AsyncIterator[bytes], s3_key: str, content_type: str, expected_length: Optional[int],
+        is_known: Optional[Callable[[str], Awaitable[bool]]] = None
+    ) -> Tuple[int, str, bool]:
+        """
+        Streams request chunks into the bucket as an S3 multipart upload, holding at most
+        one part in memory. Each part is uploaded before more of the body is read, so a
+        slow store slows the client down instead of growing the buffer.
+
+        The SHA-256 of the body is computed as it streams. If is_known reports that content
+        is already stored, the upload is abandoned instead of completed.
+        expected_length, if given, is checked against the body's size.
+        Returns (size, content_hash, stored).
+        """
+        if not self.s3_client:
+            raise HTTPException(status_code=500, detail="S3 service is not configured.")
+
+        part_size = max(settings.S3_MULTIPART_PART_BYTES, MIN_MULTIPART_PART_BYTES)
+        start = time.perf_counter()
+        buffer = bytearray()
+        digest = hashlib.sha256()
+        received = 0
+        upload_id = None
+        parts = []
+
+        try:
+            async for chunk in chunks:
+                received += len(chunk)
+                if expected_length is not None and received > expected_length:
+                    raise HTTPException(status_code=400, detail="Request body is longer than Content-Length.")
+                digest.update(chunk)
+                buffer += chunk
+                while len(buffer) >= part_size:
+                    if upload_id is None:
+                        upload_id = await self.create_multipart_upload(s3_key, content_type)
+                    data = bytes(buffer[:part_size])
+                    del buffer[:part_size]
+                    parts.append(await self.upload_part(s3_key, upload_id, len(parts) + 1, data))
+
+            if expected_length is not None and received != expected_length:
+                raise HTTPException(status_code=400, detail="Request body is shorter than Content-Length.")
+
+            content_hash = digest.hexdigest()
+            if is_known is not None and await is_known(content_hash):
+                if upload_id is not None:
+                    await self.abort_multipart_upload(s3_key, upload_id)
+                print(f"Skipped storing {received} bytes for {s3_key}: content {content_hash} already stored")
+                return received, content_hash, False
+
+            if upload_id is None:
+                # Smaller than one part: a single PUT is enough
+                await self._in_executor(
+                    self.s3_client.put_object,
+                    Bucket=self.bucket_name, Key=s3_key, Body=bytes(buffer),
+                    ContentType=content_type, ACL="public-read"
+                )
+            else:
+                if buffer:
+                    parts.append(await self.upload_part(s3_key, upload_id, len(parts) + 1, bytes(buffer)))
+                await self.complete_multipart_upload(s3_key, upload_id, parts)
+            print(f"Successfully streamed {received} bytes to {s3_key}")
+            return received, content_hash, True
+
+        except (Exception, asyncio.CancelledError) as e:
+            # Covers client disconnects (cancellation) as well as storage errors. The
+            # abort is shielded so a cancelled request still discards its parts.
+            if upload_id is not None:
+                await asyncio.shield(self.abort_multipart_upload(s3_key, upload_id))
+            if isinstance(e, (HTTPException, asyncio.CancelledError)):
+                raise
+            print(f"Error streaming file to S3: {e}")
             raise HTTPException(status_code=500, detail="Failed to upload file to storage.")
+        finally:
+            upload_latency.observe(time.perf_counter() - start)
 
 s3_service = S3Service()
 
@@ -0,0 +1,193 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+
+TileKey = Tuple[int, int, int]
+
+# Tile geometry parameters shared with the MVT endpoint
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+MAX_TILE_ZOOM = 22
+
+class TileCache:
+    """
+    On-disk cache of generated vector tiles with a bounded total size and LRU eviction.
+    Tiles are stored as {cache_dir}/{z}/{x}/{y}.pbf; the LRU order and size accounting
+    are kept in memory and rebuilt from file modification times on startup. File
+    access runs in worker threads so it never blocks the event loop.
+    Tiles older than max_age seconds are regenerated: that bounds how long a tile can
+    stay stale after a missed invalidation, e.g. one published while the process was
+    down or reconnecting to RabbitMQ.
+
+    The index is per process: each process only serves, evicts and invalidates the
+    tiles it wrote itself (every process receives every report event), and max_bytes
+    bounds each process's tiles, so with N API processes sharing cache_dir the
+    directory can grow to N * max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, max_age: float):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        # key -> (size in bytes, time.time() when written)
+        self.entries: "OrderedDict[TileKey, Tuple[int, float]]" = OrderedDict()
+        self.total_bytes = 0
+        # Bumped by every invalidation; a tile generated before a bump may be stale
+        self.generation = 0
+        self._load_existing()
+
+    async def get(self, z: int, x: int, y: int) -> Optional[bytes]:
+        """Return a cached tile, or None on a miss."""
+        key = (z, x, y)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[1] > self.max_age:
+            self._forget(key)
+            await asyncio.to_thread(_remove_files, [self._path(key)])
+            return None
+        try:
+            data = await asyncio.to_thread(_read_file, self._path(key))
+        except OSError:
+            self._forget(key)
+            return None
+        if key in self.entries:
+            self.entries.move_to_end(key)
+        return data
+
+    async def put(self, z: int, x: int, y: int, data: bytes, generation: int):
+        """
+        Store a tile, evicting least recently used tiles to stay within the size bound.
+        'generation' is the value of self.generation read before the tile was
+        generated; if an invalidation happened since, the tile may predate the change
+        and is not stored.
+        """
+        key = (z, x, y)
+        if len(data) > self.max_bytes or generation != self.generation:
+            return
+        path = self._path(key)
+        try:
+            await asyncio.to_thread(_write_file, path, data)
+        except OSError as e:
+            print(f"[TileCache] Failed to write tile {key}: {e}")
+            return
+        if generation != self.generation:
+            # Invalidated while the file was written: the tile was not indexed yet, so drop it here
+            await asyncio.to_thread(_remove_files, [path])
+            return
+
+        self._forget(key)
+        self.entries[key] = (len(data), time.time())
+        self.total_bytes += len(data)
+        evicted = []
+        while self.total_bytes > self.max_bytes and self.entries:
+            evicted.append(self._pop_oldest())
+        if evicted:
+            await asyncio.to_thread(_remove_files, evicted)
+
+    async def invalidate_point(self, latitude: float, longitude: float) -> int:
+        """
+        Drop every cached tile (at every zoom) whose area, including the tile buffer,
+        contains the given point. Returns the number of tiles removed.
+        """
+        self.generation += 1
+        removed: List[str] = []
+        for key in tiles_containing(latitude, longitude):
+            if key in self.entries:
+                self._forget(key)
+                removed.append(self._path(key))
+        if removed:
+            await asyncio.to_thread(_remove_files, removed)
+        return len(removed)
+
+    async def on_report_event(self, event: Dict[str, Any]):
+        """Report event listener: invalidate the tiles around a created or re-scored report."""
+        if event.get("latitude") is None or event.get("longitude") is None:
+            return
+        await self.invalidate_point(event["latitude"], event["longitude"])
+
+    def _path(self, key: TileKey) -> str:
+        z, x, y = key
+        return os.path.join(self.cache_dir, str(z), str(x), f"{y}.pbf")
+
+    def _forget(self, key: TileKey):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[0]
+
+    def _pop_oldest(self) -> str:
+        """Drop the least recently used tile from the index and return its path."""
+        key = next(iter(self.entries))
+        self._forget(key)
+        return self._path(key)
+
+    def _load_existing(self):
+        expired = []
+        found = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".pbf"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    rel = os.path.relpath(path, self.cache_dir).split(os.sep)
+                    key = (int(rel[0]), int(rel[1]), int(rel[2][:-len(".pbf")]))
+                    stat = os.stat(path)
+                except (OSError, ValueError, IndexError):
+                    continue
+                if time.time() - stat.st_mtime > self.max_age:
+                    expired.append(path)
+                else:
+                    found.append((stat.st_mtime, key, stat.st_size))
+
+        for written, key, size in sorted(found):
+            self.entries[key] = (size, written)
+            self.total_bytes += size
+        evicted = expired
+        while self.total_bytes > self.max_bytes and self.entries:
+            evicted.append(self._pop_oldest())
+        _remove_files(evicted)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write_file(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _remove_files(paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def tiles_containing(latitude: float, longitude: float):
+    """Yield the (z, x, y) web-mercator tiles whose buffered area contains a point."""
+    lat = max(min(latitude, 85.0511), -85.0511)
+    buffer = TILE_BUFFER / TILE_EXTENT
+    fx_unit = (longitude + 180.0) / 360.0
+    fy_unit = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0
+
+    for z in range(MAX_TILE_ZOOM + 1):
+        n = 2 ** z
+        fx, fy = fx_unit * n, fy_unit * n
+        for x in range(max(int(math.floor(fx - buffer)), 0), min(int(math.floor(fx + buffer)), n - 1) + 1):
+            for y in range(max(int(math.floor(fy - buffer)), 0), min(int(math.floor(fy + buffer)), n - 1) + 1):
+                yield (z, x, y)
+
+# Global instance
+tile_cache = TileCache(settings.TILE_CACHE_DIR, settings.TILE_CACHE_MAX_BYTES, settings.TILE_CACHE_MAX_AGE_SECONDS)
@@ -0,0 +1,130 @@
+import asyncio
+import hashlib
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.models import RevokedToken
+from app.db.session import AsyncSessionLocal
+from app.services.metrics import metrics
+
+bloom_positives = metrics.counter("token_revocation_bloom_positives_total", "Token checks the Bloom filter could not clear, confirmed in the database")
+# Rows revoked this close to the last sync are re-read, in case they committed late
+SYNC_OVERLAP = timedelta(seconds=10)
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings: no false negatives, rare false positives."""
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenRevocationService:
+    """
+    Revoked token and session ids. The revoked_tokens table is the source of truth;
+    each API process keeps a Bloom filter of it, refreshed every
+    TOKEN_REVOCATION_SYNC_SECONDS, so checking a token that was never revoked costs
+    no database access. Only ids the filter cannot clear are confirmed in the table.
+    The filter is rebuilt from unexpired rows every TOKEN_REVOCATION_REBUILD_SECONDS,
+    which also drops expired rows.
+    """
+
+    def __init__(self):
+        self.bloom = BloomFilter(settings.TOKEN_REVOCATION_CAPACITY)
+        self.synced_until: Optional[datetime] = None
+        self.last_rebuild = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+    async def revoke(self, db: AsyncSession, token_ids: Iterable[str], expires_at: datetime):
+        """Revoke ids (jti or sid) until the tokens carrying them would expire anyway."""
+        rows = [{"id": token_id, "expires_at": expires_at} for token_id in token_ids]
+        if not rows:
+            return
+        await db.execute(insert(RevokedToken).values(rows).on_conflict_do_nothing())
+        await db.commit()
+        for row in rows:
+            self.bloom.add(row["id"])
+
+    async def is_revoked(self, db: AsyncSession, *token_ids: str) -> bool:
+        candidates = [token_id for token_id in token_ids if token_id and token_id in self.bloom]
+        if not candidates:
+            return False
+        bloom_positives.inc()
+        result = await db.execute(select(RevokedToken.id).where(RevokedToken.id.in_(candidates)).limit(1))
+        return result.first() is not None
+
+    async def revoked_at(self, db: AsyncSession, token_id: str) -> Optional[datetime]:
+        """When an id was revoked, or None if it is not."""
+        result = await db.execute(select(RevokedToken.revoked_at).where(RevokedToken.id == token_id))
+        return result.scalar_one_or_none()
+
+    async def start(self):
+        """Load the revocation list, then keep it in sync in the background."""
+        await self.sync()
+        self.task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+
+    async def sync(self):
+        loop = asyncio.get_running_loop()
+        async with AsyncSessionLocal() as db:
+            if self.synced_until is None or loop.time() - self.last_rebuild >= settings.TOKEN_REVOCATION_REBUILD_SECONDS:
+                await self._rebuild(db)
+                self.last_rebuild = loop.time()
+            else:
+                result = await db.execute(
+                    select(RevokedToken.id, RevokedToken.revoked_at)
+                    .where(RevokedToken.revoked_at > self.synced_until - SYNC_OVERLAP)
+                )
+                for token_id, revoked_at in result.all():
+                    self.bloom.add(token_id)
+                    self.synced_until = max(self.synced_until, revoked_at)
+
+    async def _rebuild(self, db: AsyncSession):
+        now = datetime.now(timezone.utc)
+        await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        await db.commit()
+
+        result = await db.execute(select(RevokedToken.id, RevokedToken.revoked_at))
+        rows = result.all()
+        bloom = BloomFilter(max(settings.TOKEN_REVOCATION_CAPACITY, 2 * len(rows)))
+        for token_id, _ in rows:
+            bloom.add(token_id)
+        # Ids revoked by this process while the rebuild ran are re-read by the next sync
+        self.bloom = bloom
+        self.synced_until = max((revoked_at for _, revoked_at in rows), default=now)
+        print(f"[TokenRevocation] Loaded {len(rows)} revoked token ids.")
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(settings.TOKEN_REVOCATION_SYNC_SECONDS)
+            try:
+                await self.sync()
+            except Exception as e:
+                print(f"[TokenRevocation] Sync failed: {e}")
+
+# Global instance
+token_revocations = TokenRevocationService()
@@ -0,0 +1,102 @@
+import json
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+from aio_pika.abc import AbstractIncomingMessage
+
+from app.core.config import settings
+from app.db.models import User, UserRole
+from app.services.metrics import metrics
+from app.services.rabbitmq_service import rabbitmq_service
+
+cache_hits = metrics.counter("user_cache_hits_total", "Authenticated requests resolved from the user cache")
+cache_misses = metrics.counter("user_cache_misses_total", "Authenticated requests that loaded the user from the database")
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Immutable snapshot of a user row, safe to share between requests."""
+    id: uuid.UUID
+    email: str
+    full_name: str
+    role: UserRole
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_model(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+            created_at=user.created_at,
+        )
+
+class UserCache:
+    """
+    In-process TTL + LRU cache of authenticated users, keyed by user id, so that
+    get_current_user does not query Postgres on every request.
+    Entries are immutable snapshots, not ORM instances.
+    A change to a user (deactivation, role change) is broadcast with
+    publish_invalidation so every API process drops it; the TTL bounds how long
+    a missed broadcast can leave a stale entry.
+    """
+
+    EXCHANGE_NAME = "user_events"
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[uuid.UUID, Tuple[float, CachedUser]]" = OrderedDict()
+
+    def get(self, user_id: uuid.UUID) -> Optional[CachedUser]:
+        entry = self.entries.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self.entries[user_id]
+            cache_misses.inc()
+            return None
+        self.entries.move_to_end(user_id)
+        cache_hits.inc()
+        return entry[1]
+
+    def put(self, user: CachedUser):
+        self.entries[user.id] = (time.monotonic() + self.ttl_seconds, user)
+        self.entries.move_to_end(user.id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, user_id: uuid.UUID):
+        """Drop a user from this process's cache."""
+        self.entries.pop(user_id, None)
+
+    async def publish_invalidation(self, user_id: uuid.UUID):
+        """
+        Drop a user from every API process's cache. Call after committing a change
+        to the user's role or active status.
+        """
+        self.invalidate(user_id)
+        try:
+            await rabbitmq_service.publish_event(
+                self.EXCHANGE_NAME, {"type": "user_changed", "user_id": str(user_id)}
+            )
+        except Exception as e:
+            print(f"[UserCache] Failed to broadcast invalidation of user {user_id}: {e}")
+
+    async def start(self):
+        """Subscribe this process to user invalidation broadcasts."""
+        await rabbitmq_service.subscribe_events(self.EXCHANGE_NAME, self._on_message)
+
+    async def _on_message(self, message: AbstractIncomingMessage):
+        try:
+            event = json.loads(message.body.decode())
+            self.invalidate(uuid.UUID(event["user_id"]))
+        except Exception as e:
+            print(f"[UserCache] Dropping malformed invalidation: {e}")
+
+# Global instance
+user_cache = UserCache(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS)
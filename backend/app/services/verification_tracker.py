@@ -1,14 +1,24 @@
+import uuid
 from typing import Dict, Set, Optional
+from sqlalchemy import Numeric, and_, case, cast, func, literal, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.db.models import Verification, VerificationSource, Report
+from app.db.models import (
+    Report, ReportStatus, Verification, VerificationSource, VERIFICATION_SOURCE_BITS, report_point
+)
 from app.services.confidence_calculator import confidence_calculator
-import asyncio
+from app.services.report_events import report_events
 
 class VerificationTracker:
     """
-    Tracks verification completion and triggers automatic confidence calculation
-    when both weather_api and nlp_pipeline verifications are complete.
+    Records verifications and scores a report once both weather_api and nlp_pipeline
+    verifications are in without errors.
+    Each report keeps running aggregates (weighted score sum, weight, bitmasks of the
+    sources seen and of those that failed), so recording a verification is a single
+    statement: it inserts the verification, adds it to the aggregates and, when the
+    report is complete, sets the score and status, without reading the report's
+    other verifications.
     """
     
     def __init__(self):
@@ -16,64 +26,116 @@ class VerificationTracker:
         self.pending_reports: Dict[str, Set[VerificationSource]] = {}
         # Required sources for automatic calculation
         self.required_sources = {VerificationSource.weather_api, VerificationSource.nlp_pipeline}
+        self.required_mask = 0
+        for source in self.required_sources:
+            self.required_mask |= VERIFICATION_SOURCE_BITS[source]
     
-    async def check_and_calculate_confidence(self, report_id: str, db: AsyncSession) -> Optional[Dict]:
+    async def record_verification(
+        self, db: AsyncSession, report_id: uuid.UUID, source: VerificationSource, result_data: Dict
+    ) -> Optional[Dict]:
         """
-        Check if all required verifications are complete and calculate confidence if so.
-        Returns the confidence result if calculated, None otherwise.
+        Insert a verification and update the report's confidence in one statement.
+        Returns None if the report does not exist; otherwise a dict with the report's
+        status and score, and confidence_level set if the report was scored.
         """
-        try:
-            # Get all verifications for this report
-            result = await db.execute(
-                select(Verification).where(Verification.report_id == report_id)
+        score, weight, _ = confidence_calculator.score_verification(source, result_data)
+        source_bit = VERIFICATION_SOURCE_BITS[source]
+        error_bit = source_bit if "error" in result_data else 0
+
+        # The verification goes into its report's partition, found by the id lookup
+        new_verification = (
+            insert(Verification)
+            .from_select(
+                ["id", "report_id", "report_created_at", "source", "result_data"],
+                select(
+                    literal(uuid.uuid4(), Verification.id.type),
+                    Report.id,
+                    Report.created_at,
+                    cast(source, Verification.source.type),
+                    literal(result_data, Verification.result_data.type)
+                ).where(Report.id == report_id)
+            )
+            .returning(Verification.report_id, Verification.report_created_at)
+            .cte("new_verification")
+        )
+
+        # SET expressions see the row before the update, so add this verification in
+        new_weighted_sum = Report.confidence_weighted_sum + score * weight
+        new_weight = Report.confidence_weight + weight
+        ratio = new_weighted_sum / func.nullif(new_weight, 0.0)
+        complete = and_(
+            Report.verification_sources.op("|")(source_bit).op("&")(self.required_mask) == self.required_mask,
+            Report.verification_error_sources.op("|")(error_bit) == 0
+        )
+        statement = (
+            update(Report)
+            .where(
+                Report.id == new_verification.c.report_id,
+                Report.created_at == new_verification.c.report_created_at
+            )
+            .values(
+                confidence_weighted_sum=new_weighted_sum,
+                confidence_weight=new_weight,
+                verification_sources=Report.verification_sources.op("|")(source_bit),
+                verification_error_sources=Report.verification_error_sources.op("|")(error_bit),
+                final_confidence_score=case(
+                    (complete, func.round(cast(ratio, Numeric), 2)), else_=Report.final_confidence_score
+                ),
+                # Medium and Low remain "under_verification" for manual review
+                status=case(
+                    (and_(complete, ratio >= confidence_calculator.VERIFY_AT), cast(ReportStatus.verified, Report.status.type)),
+                    (and_(complete, ratio < confidence_calculator.REJECT_BELOW), cast(ReportStatus.rejected, Report.status.type)),
+                    else_=Report.status
+                ),
+                updated_at=case((complete, func.timezone("utc", func.now())), else_=Report.updated_at)
             )
-            verifications = result.scalars().all()
-            
-            # Check if we have both required sources
-            completed_sources = {v.source for v in verifications}
-            if not self.required_sources.issubset(completed_sources):
-                print(f"[VerificationTracker] Report {report_id} missing required verifications. "
-                      f"Completed: {completed_sources}, Required: {self.required_sources}")
-                return None
-            
-            # Check if any verification has errors (don't auto-calculate if there are errors)
-            has_errors = any("error" in v.result_data for v in verifications)
-            if has_errors:
-                print(f"[VerificationTracker] Report {report_id} has verification errors, skipping auto-calculation")
-                return None
-            
-            print(f"[VerificationTracker] All required verifications complete for report {report_id}. Calculating confidence...")
-            
-            # Calculate confidence score
-            confidence_result = confidence_calculator.calculate_confidence(verifications)
-            
-            # Get the report and update it
-            report = await db.get(Report, report_id)
-            if not report:
-                print(f"[VerificationTracker] Report {report_id} not found in database")
-                return None
-            
-            # Update report with confidence score and status
-            report.final_confidence_score = confidence_result["confidence_score"]
-            
-            # Update report status based on confidence level
-            confidence_level = confidence_result["confidence_level"]
-            if confidence_level == "High":
-                report.status = "verified"
-            elif confidence_level == "Very Low":
-                report.status = "rejected"
-            # Medium and Low remain "under_verification" for manual review
-            
-            await db.commit()
-            
-            print(f"[VerificationTracker]  Confidence calculated for report {report_id}: "
-                  f"Score={confidence_result['confidence_score']}, Level={confidence_level}")
-            
-            return confidence_result
-            
-        except Exception as e:
-            print(f"[VerificationTracker] Error calculating confidence for report {report_id}: {e}")
+            .returning(
+                Report.id,
+                Report.user_hazard_type,
+                Report.status,
+                Report.final_confidence_score,
+                Report.confidence_weighted_sum,
+                Report.confidence_weight,
+                complete.label("complete"),
+                func.ST_Y(report_point),
+                func.ST_X(report_point)
+            )
+            .add_cte(new_verification)
+            .execution_options(synchronize_session=False)
+        )
+        row = (await db.execute(statement)).first()
+        await db.commit()
+        if row is None:
             return None
+
+        (report_id, hazard_type, status, confidence_score, weighted_sum,
+         total_weight, scored, latitude, longitude) = row
+        result = {
+            "report_id": report_id,
+            "status": status.value,
+            "confidence_score": confidence_score,
+            "confidence_level": None
+        }
+        if not scored:
+            print(f"[VerificationTracker] Recorded {source.value} verification for report {report_id}; "
+                  f"not scored until all required verifications are in without errors")
+            return result
+
+        result["confidence_level"] = confidence_calculator.get_confidence_level(weighted_sum / total_weight)
+        print(f"[VerificationTracker]  Confidence calculated for report {report_id}: "
+              f"Score={confidence_score}, Level={result['confidence_level']}")
+
+        # Let API processes drop cached tiles around the re-scored report
+        await report_events.publish(
+            "report_scored",
+            report_id,
+            latitude,
+            longitude,
+            hazard_type=hazard_type.value,
+            status=status.value,
+            confidence=confidence_score
+        )
+        return result
     
     def add_pending_verification(self, report_id: str, source: VerificationSource):
         """Add a pending verification to track."""
@@ -0,0 +1,83 @@
+"""
+Login storm benchmark.
+
+Fires concurrent sign-ins at /api/auth/login while probing /api/reports/hotspots,
+then reports login throughput and how much the storm slowed hotspot requests.
+With bcrypt on the event loop the hotspot latency tracks the login load; with the
+bounded password pool it should stay close to the baseline.
+
+    python bench_login.py --email user@example.com --password secret --concurrency 50
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import List
+
+import httpx
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def login_loop(client: httpx.AsyncClient, args, stop_at: float, statuses: Counter, latencies: List[float]):
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/auth/login", data={"username": args.email, "password": args.password}
+        )
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] += 1
+
+
+async def probe_hotspots(client: httpx.AsyncClient, stop_at: float, latencies: List[float]):
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        await client.get("/api/reports/hotspots", params={"limit": 100})
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.1)
+
+
+def print_latencies(label: str, latencies: List[float]):
+    print(
+        f"{label}: n={len(latencies)} p50={percentile(latencies, 0.5) * 1000:.1f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:.1f}ms max={max(latencies, default=0) * 1000:.1f}ms"
+    )
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 5)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        baseline: List[float] = []
+        await probe_hotspots(client, time.perf_counter() + args.baseline_seconds, baseline)
+
+        statuses: Counter = Counter()
+        login_latencies: List[float] = []
+        hotspot_latencies: List[float] = []
+        start = time.perf_counter()
+        stop_at = start + args.duration
+        await asyncio.gather(
+            probe_hotspots(client, stop_at, hotspot_latencies),
+            *(login_loop(client, args, stop_at, statuses, login_latencies) for _ in range(args.concurrency))
+        )
+        elapsed = time.perf_counter() - start
+
+    print(f"logins: {sum(statuses.values()) / elapsed:.1f}/s over {elapsed:.1f}s, statuses {dict(statuses)}")
+    print_latencies("login", login_latencies)
+    print_latencies("hotspots before storm", baseline)
+    print_latencies("hotspots during storm", hotspot_latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure login throughput and hotspot latency under a login storm.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True, help="Email of an existing account")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent login loops")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run the storm")
+    parser.add_argument("--baseline-seconds", type=float, default=3.0, help="Seconds to probe hotspots before the storm")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,123 @@
+"""
+Query plan check.
+
+EXPLAINs the hot read queries against the database in SYNC_DATABASE_URL and exits
+non-zero if any of them plans a sequential scan, i.e. if an index they rely on is
+missing (or a query stopped matching it), or if a time-bounded query reads more
+monthly report partitions than it should. Sequential scans are disabled for the
+session, so the check also works on small or empty databases, where the planner
+would otherwise prefer them anyway.
+
+    alembic upgrade head && python check_query_plans.py
+"""
+import json
+import re
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.db.models import HOTSPOT_CONFIDENCE_THRESHOLD
+
+NOW = datetime.now(timezone.utc)
+REPORT_POINT = "CAST(reports.user_location AS geometry(POINT,4326))"
+REPORT_PARTITION = re.compile(r"^reports_y\d{4}m\d{2}$")
+# A window of HOTSPOT_ACTIVE_DAYS (at most a month) spans at most two monthly partitions
+ACTIVE_WINDOW_PARTITIONS = 2
+
+# name -> (SQL, parameters[, maximum report partitions]); each mirrors a query in the API or the workers
+HOT_QUERIES = {
+    "verifications of a report (confidence scoring)": (
+        "SELECT * FROM verifications WHERE report_id = :report_id AND report_created_at = :created_at",
+        {"report_id": uuid.uuid4(), "created_at": NOW},
+    ),
+    "/recent first page with thumbnails": (
+        "SELECT reports.id, reports.created_at, thumbnail.file_url FROM reports "
+        "LEFT OUTER JOIN LATERAL (SELECT media.file_url FROM media WHERE media.report_id = reports.id "
+        "AND media.report_created_at = reports.created_at "
+        "ORDER BY media.created_at ASC LIMIT 1) AS thumbnail ON true "
+        "ORDER BY reports.created_at DESC, reports.id DESC LIMIT 10",
+        {},
+    ),
+    "/recent next page": (
+        "SELECT reports.id FROM reports WHERE (reports.created_at, reports.id) < (:created_at, :id) "
+        "ORDER BY reports.created_at DESC, reports.id DESC LIMIT 10",
+        {"created_at": NOW, "id": uuid.uuid4()},
+    ),
+    "/hotspots in a viewport": (
+        f"SELECT reports.id, ST_Y({REPORT_POINT}), ST_X({REPORT_POINT}) FROM reports "
+        "WHERE reports.final_confidence_score >= :min_confidence "
+        f"AND ST_Intersects({REPORT_POINT}, ST_MakeEnvelope(72.0, 18.0, 73.0, 19.5, 4326))",
+        {"min_confidence": HOTSPOT_CONFIDENCE_THRESHOLD},
+    ),
+    "/hotspots filtered by status and time": (
+        "SELECT reports.id FROM reports WHERE reports.final_confidence_score >= :min_confidence "
+        "AND reports.status = 'verified' AND reports.created_at >= :since "
+        "AND reports.created_at <= TIMEZONE('utc', now())",
+        {"min_confidence": HOTSPOT_CONFIDENCE_THRESHOLD, "since": NOW - timedelta(days=1)},
+        ACTIVE_WINDOW_PARTITIONS,
+    ),
+    "/hotspots active window": (
+        "SELECT reports.id FROM reports WHERE reports.final_confidence_score >= :min_confidence "
+        "AND reports.created_at >= :since AND reports.created_at <= TIMEZONE('utc', now())",
+        {"min_confidence": HOTSPOT_CONFIDENCE_THRESHOLD, "since": NOW - timedelta(days=settings.HOTSPOT_ACTIVE_DAYS)},
+        ACTIVE_WINDOW_PARTITIONS,
+    ),
+    "reports by status": (
+        "SELECT reports.id FROM reports WHERE reports.status = 'under_verification'",
+        {},
+    ),
+    "/hotspots/changes delta feed": (
+        "SELECT reports.id FROM reports WHERE (reports.updated_at, reports.id) > (:updated_at, :id) "
+        "ORDER BY reports.updated_at, reports.id LIMIT 101",
+        {"updated_at": NOW - timedelta(minutes=5), "id": uuid.uuid4()},
+    ),
+    "media by content hash (dedup)": (
+        "SELECT media.id FROM media WHERE media.content_hash = :content_hash",
+        {"content_hash": "0" * 64},
+    ),
+}
+
+
+def scanned_relations(plan: dict) -> list:
+    """(node type, relation) of every scan node in a plan tree."""
+    found = [(plan["Node Type"], plan["Relation Name"])] if "Relation Name" in plan else []
+    for child in plan.get("Plans", []):
+        found += scanned_relations(child)
+    return found
+
+
+def main() -> int:
+    engine = create_engine(settings.SYNC_DATABASE_URL)
+    failures = 0
+    with engine.connect() as conn:
+        conn.execute(text("SET enable_seqscan = off"))
+        for name, (sql, params, *max_partitions) in HOT_QUERIES.items():
+            plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            scanned = scanned_relations(plan[0]["Plan"])
+            seq_scanned = sorted({relation for node, relation in scanned if node == "Seq Scan"})
+            partitions = {relation for _, relation in scanned if REPORT_PARTITION.match(relation)}
+            if seq_scanned:
+                failures += 1
+                print(f"FAIL  {name}: sequential scan on {', '.join(seq_scanned)}")
+            elif max_partitions and len(partitions) > max_partitions[0]:
+                failures += 1
+                print(f"FAIL  {name}: reads {len(partitions)} report partitions, expected at most {max_partitions[0]}")
+            else:
+                print(f"ok    {name}")
+    engine.dispose()
+
+    if failures:
+        print(f"{failures} hot queries fall back to sequential scans or skip partition pruning; "
+              "run 'alembic upgrade head'.")
+        return 1
+    print("All hot queries use indexes.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Cleanup of abandoned media uploads. Run this hourly (cron, Kubernetes CronJob, ...):
+
+- deletes resumable upload sessions past their expires_at, aborting the S3
+  multipart upload of each unfinished one so its parts stop being billed;
+- aborts multipart uploads left in the bucket with no session, e.g. by a
+  /media/stream request whose process died mid-upload, once they are older than
+  UPLOAD_SESSION_EXPIRE_HOURS.
+
+As a backstop, give the bucket a lifecycle rule that aborts incomplete multipart
+uploads after a day or two (AbortIncompleteMultipartUpload, DaysAfterInitiation).
+
+    python cleanup_uploads.py [--dry-run]
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, delete, select
+
+from app.core.config import settings
+from app.db.models import UploadSession
+from app.services.s3_service import s3_service
+
+BATCH_SIZE = 500
+
+
+def abort(s3_key: str, upload_id: str, dry_run: bool):
+    print(f"[UploadCleanup] Aborting multipart upload {upload_id} of {s3_key}")
+    if dry_run:
+        return
+    try:
+        s3_service.s3_client.abort_multipart_upload(Bucket=s3_service.bucket_name, Key=s3_key, UploadId=upload_id)
+    except Exception as e:
+        print(f"[UploadCleanup] Could not abort {upload_id} of {s3_key}: {e}")
+
+
+def delete_expired_sessions(conn, dry_run: bool) -> int:
+    now = datetime.now(timezone.utc)
+    removed = 0
+    while True:
+        rows = conn.execute(
+            select(UploadSession.id, UploadSession.s3_key, UploadSession.s3_upload_id, UploadSession.completed)
+            .where(UploadSession.expires_at <= now)
+            .order_by(UploadSession.expires_at)
+            .offset(removed if dry_run else 0)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return removed
+        for _, s3_key, upload_id, completed in rows:
+            if not completed:
+                abort(s3_key, upload_id, dry_run)
+        if not dry_run:
+            conn.execute(delete(UploadSession).where(UploadSession.id.in_([row[0] for row in rows])))
+            conn.commit()
+        removed += len(rows)
+
+
+def abort_orphaned_uploads(conn, dry_run: bool) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.UPLOAD_SESSION_EXPIRE_HOURS)
+    live = set(conn.execute(select(UploadSession.s3_upload_id)).scalars().all())
+    aborted = 0
+    paginator = s3_service.s3_client.get_paginator("list_multipart_uploads")
+    for page in paginator.paginate(Bucket=s3_service.bucket_name):
+        for upload in page.get("Uploads", []):
+            if upload["UploadId"] in live or upload["Initiated"] > cutoff:
+                continue
+            abort(upload["Key"], upload["UploadId"], dry_run)
+            aborted += 1
+    return aborted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete expired upload sessions and abort abandoned multipart uploads.")
+    parser.add_argument("--dry-run", action="store_true", help="Print what would be removed without removing it")
+    args = parser.parse_args()
+
+    if not s3_service.s3_client:
+        raise SystemExit("[UploadCleanup] S3 is not configured.")
+
+    engine = create_engine(settings.SYNC_DATABASE_URL)
+    with engine.connect() as conn:
+        sessions = delete_expired_sessions(conn, args.dry_run)
+        orphans = abort_orphaned_uploads(conn, args.dry_run)
+    engine.dispose()
+    print(f"[UploadCleanup] Done: {sessions} expired sessions, {orphans} orphaned multipart uploads.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,30 @@
+import argparse
 import asyncio
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
 from app.db.session import engine
 from app.db.models import Base
 
-async def create_all_tables():
-    """Connects to the database and creates all tables."""
+ALEMBIC_INI = "alembic.ini"
+
+async def drop_all_tables():
+    """Drops every table, including the migration history. Destroys all data."""
     async with engine.begin() as conn:
         print("Dropping all existing tables...")
         await conn.run_sync(Base.metadata.drop_all)
-        print("Creating new tables...")
-        await conn.run_sync(Base.metadata.create_all)
-        print("Tables created successfully.")
+        await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    await engine.dispose()
+
+def create_all_tables(reset: bool = False):
+    """Brings the database schema up to date by applying pending migrations."""
+    if reset:
+        asyncio.run(drop_all_tables())
+    print("Applying migrations...")
+    command.upgrade(Config(ALEMBIC_INI), "head")
+    print("Tables are up to date.")
 
 if __name__ == "__main__":
-    asyncio.run(create_all_tables())
+    parser = argparse.ArgumentParser(description="Create or upgrade the database schema.")
+    parser.add_argument("--reset", action="store_true", help="Drop all tables and data first")
+    create_all_tables(parser.parse_args().reset)
@@ -0,0 +1,173 @@
+"""
+Cold archive export.
+
+Writes closed months of reports, verifications and media metadata to Parquet under
+ARCHIVE_DIR, one file per table and month:
+
+    <ARCHIVE_DIR>/<table>/year=<YYYY>/month=<MM>/data.parquet
+
+A month is closed once EXPORT_GRACE_DAYS have passed since it ended. Rows are read
+from SYNC_DATABASE_URL through server-side cursors, EXPORT_BATCH_ROWS at a time, so
+memory stays flat however large the month is. Each query reads a single monthly
+partition, or the partition in PARTITION_ARCHIVE_SCHEMA if partition_maintenance.py
+has already detached it. Months that already have a file are skipped.
+
+    python export_archive.py                    # every closed month not exported yet
+    python export_archive.py --month 2026-08 --overwrite
+"""
+import argparse
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+# Timestamps are stored as UTC without a time zone, which every Parquet reader understands
+TIMESTAMP = pa.timestamp("us")
+
+# table -> (partition key, SELECT list, Arrow schema). Enums, ids and JSON are
+# exported as strings, locations as latitude/longitude, timestamps in UTC.
+EXPORTS = {
+    "reports": (
+        "created_at",
+        "id::text, user_id::text, user_hazard_type::text, status::text, "
+        "ST_Y(user_location::geometry), ST_X(user_location::geometry), "
+        "user_description, user_city, final_confidence_score, "
+        "created_at AT TIME ZONE 'UTC', updated_at AT TIME ZONE 'UTC'",
+        pa.schema([
+            ("id", pa.string()), ("user_id", pa.string()), ("hazard_type", pa.string()), ("status", pa.string()),
+            ("latitude", pa.float64()), ("longitude", pa.float64()),
+            ("user_description", pa.string()), ("user_city", pa.string()),
+            ("final_confidence_score", pa.float64()), ("created_at", TIMESTAMP), ("updated_at", TIMESTAMP),
+        ]),
+    ),
+    "verifications": (
+        "report_created_at",
+        "id::text, report_id::text, report_created_at AT TIME ZONE 'UTC', source::text, result_data::text, "
+        "created_at AT TIME ZONE 'UTC'",
+        pa.schema([
+            ("id", pa.string()), ("report_id", pa.string()), ("report_created_at", TIMESTAMP),
+            ("source", pa.string()), ("result_data", pa.string()), ("created_at", TIMESTAMP),
+        ]),
+    ),
+    "media": (
+        "report_created_at",
+        "id::text, report_id::text, report_created_at AT TIME ZONE 'UTC', media_type::text, file_url, "
+        "content_hash, file_metadata::text, created_at AT TIME ZONE 'UTC'",
+        pa.schema([
+            ("id", pa.string()), ("report_id", pa.string()), ("report_created_at", TIMESTAMP),
+            ("media_type", pa.string()), ("file_url", pa.string()), ("content_hash", pa.string()),
+            ("file_metadata", pa.string()), ("created_at", TIMESTAMP),
+        ]),
+    ),
+}
+
+PARTITION_NAME = re.compile(r"^reports_y(?P<year>\d{4})m(?P<month>\d{2})$")
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def archive_path(table: str, month: date) -> str:
+    return os.path.join(settings.ARCHIVE_DIR, table, f"year={month.year}", f"month={month.month:02d}", "data.parquet")
+
+
+def last_closed_month() -> date:
+    now = datetime.now(timezone.utc).date()
+    return add_months((now - timedelta(days=settings.EXPORT_GRACE_DAYS)).replace(day=1), -1)
+
+
+def oldest_month(conn) -> date | None:
+    """Month of the oldest report, attached or detached into the archive schema."""
+    months = []
+    oldest = conn.execute(text("SELECT min(created_at) FROM reports")).scalar()
+    if oldest is not None:
+        months.append(oldest.astimezone(timezone.utc).date().replace(day=1))
+    archived = conn.execute(
+        text("SELECT tablename FROM pg_tables WHERE schemaname = :schema"),
+        {"schema": settings.PARTITION_ARCHIVE_SCHEMA}
+    ).scalars()
+    for name in archived:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match["year"]), int(match["month"]), 1))
+    return min(months, default=None)
+
+
+def source_table(conn, table: str, month: date) -> str:
+    """The attached parent table, or the month's detached partition if it was archived."""
+    archived = f"{settings.PARTITION_ARCHIVE_SCHEMA}.{table}_y{month.year}m{month.month:02d}"
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": archived}).scalar() is not None:
+        return archived
+    return table
+
+
+def export_month(engine, table: str, month: date) -> int:
+    """Write one table's month to Parquet; returns the number of rows."""
+    partition_key, columns, schema = EXPORTS[table]
+    path = archive_path(table, month)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.tmp"
+
+    rows = 0
+    with engine.connect() as conn:
+        query = text(
+            f"SELECT {columns} FROM {source_table(conn, table, month)} "
+            f"WHERE {partition_key} >= :start AND {partition_key} < :end ORDER BY {partition_key}"
+        )
+        start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+        end = datetime.combine(add_months(month, 1), datetime.min.time(), tzinfo=timezone.utc)
+        # stream_results makes psycopg2 use a named (server-side) cursor
+        result = conn.execution_options(stream_results=True, max_row_buffer=settings.EXPORT_BATCH_ROWS).execute(
+            query, {"start": start, "end": end}
+        )
+        with pq.ParquetWriter(temporary, schema, compression="zstd") as writer:
+            for batch in result.partitions(settings.EXPORT_BATCH_ROWS):
+                columns_data = list(zip(*batch))
+                writer.write_batch(pa.RecordBatch.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns_data, schema)],
+                    schema=schema
+                ))
+                rows += len(batch)
+    # Readers never see a half-written month
+    os.replace(temporary, path)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export closed months of reports to Parquet.")
+    parser.add_argument("--month", help="Export only this month (YYYY-MM)")
+    parser.add_argument("--overwrite", action="store_true", help="Re-export months that already have files")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.SYNC_DATABASE_URL)
+    last = last_closed_month()
+    if args.month:
+        first = datetime.strptime(args.month, "%Y-%m").date()
+        if first > last:
+            parser.error(f"{args.month} is not closed yet; the last closed month is {last:%Y-%m}.")
+        last = first
+    else:
+        with engine.connect() as conn:
+            first = oldest_month(conn)
+
+    month = first
+    while month is not None and month <= last:
+        for table in EXPORTS:
+            if os.path.exists(archive_path(table, month)) and not args.overwrite:
+                continue
+            rows = export_month(engine, table, month)
+            print(f"[ArchiveExport] {table} {month:%Y-%m}: {rows} rows -> {archive_path(table, month)}")
+        month = add_months(month, 1)
+    engine.dispose()
+    print("[ArchiveExport] Done.")
+
+
+if __name__ == "__main__":
+    main()
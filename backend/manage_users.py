@@ -0,0 +1,65 @@
+"""
+Deactivate, reactivate or change the role of a user.
+
+    python manage_users.py deactivate someone@example.org
+    python manage_users.py activate someone@example.org
+    python manage_users.py set-role someone@example.org analyst
+
+After committing, the change is broadcast on the user_events exchange so every
+API process drops the user from its user cache. Access tokens issued before the
+change keep their role and active claims until they expire
+(ACCESS_TOKEN_EXPIRE_MINUTES); /refresh re-reads the user, so the next token pair
+carries the new ones and a deactivated user cannot refresh at all.
+"""
+import argparse
+import asyncio
+import uuid
+
+from sqlalchemy import update
+
+from app.db.models import User, UserRole
+from app.db.session import AsyncSessionLocal
+from app.services.rabbitmq_service import rabbitmq_service
+from app.services.user_cache import user_cache
+
+
+async def update_user(email: str, **values) -> uuid.UUID | None:
+    """Apply values to the user with this email and invalidate them everywhere."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(User).where(User.email == email).values(**values).returning(User.id)
+        )
+        user_id = result.scalar_one_or_none()
+        await db.commit()
+
+    if user_id is not None:
+        await user_cache.publish_invalidation(user_id)
+    return user_id
+
+
+async def main(args):
+    if args.command == "set-role":
+        values = {"role": UserRole(args.role)}
+    else:
+        values = {"is_active": args.command == "activate"}
+
+    await rabbitmq_service.connect()
+    try:
+        user_id = await update_user(args.email, **values)
+    finally:
+        await rabbitmq_service.close()
+
+    if user_id is None:
+        raise SystemExit(f"[UserAdmin] No user with email {args.email}.")
+    print(f"[UserAdmin] Updated user {user_id}: {values}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Change a user's active status or role.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command in ("deactivate", "activate"):
+        commands.add_parser(command).add_argument("email")
+    set_role = commands.add_parser("set-role")
+    set_role.add_argument("email")
+    set_role.add_argument("role", choices=[role.value for role in UserRole])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,108 @@
+"""Baseline schema: users, reports, media and verifications
+
+The tables as create_tables.py used to create them. Databases that already have
+them (created before migrations existed) are left untouched, so 'alembic upgrade
+head' works on both new and existing databases.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from geoalchemy2 import Geography
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ENUMS = {
+    "user_role": ("citizen", "official", "analyst"),
+    "hazard_type": (
+        "tsunami", "high_waves", "coastal_flooding", "storm_surge", "rip_current",
+        "coastal_erosion", "water_discoloration", "marine_debris", "other"
+    ),
+    "report_status": ("under_verification", "verified", "rejected"),
+    "media_type": ("image", "video", "audio"),
+    "verification_source": ("nlp_pipeline", "weather_api", "peer_report"),
+}
+
+UTC_NOW = sa.text("TIMEZONE('utc', now())")
+
+
+def enum(name):
+    return postgresql.ENUM(*ENUMS[name], name=name, create_type=False)
+
+
+def upgrade():
+    bind = op.get_bind()
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+    for name, values in ENUMS.items():
+        postgresql.ENUM(*values, name=name).create(bind, checkfirst=True)
+
+    existing = set(sa.inspect(bind).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("full_name", sa.String(255), nullable=False),
+            sa.Column("hashed_password", sa.String(), nullable=False),
+            sa.Column("role", enum("user_role"), nullable=False),
+            sa.Column("is_active", sa.Boolean(), nullable=False),
+            sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=UTC_NOW, nullable=False),
+        )
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "reports" not in existing:
+        op.create_table(
+            "reports",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("user_hazard_type", enum("hazard_type"), nullable=False),
+            sa.Column(
+                "user_location",
+                Geography(geometry_type="POINT", srid=4326, spatial_index=False),
+                nullable=False
+            ),
+            sa.Column("user_description", sa.String()),
+            sa.Column("user_city", sa.String(255), nullable=True),
+            sa.Column("status", enum("report_status"), nullable=False),
+            sa.Column("final_confidence_score", sa.Float()),
+            sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=UTC_NOW, nullable=False),
+        )
+        # The geography index GeoAlchemy2 used to create; 0003 replaces it
+        op.execute("CREATE INDEX idx_reports_user_location ON reports USING gist (user_location)")
+
+    if "media" not in existing:
+        op.create_table(
+            "media",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("report_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("reports.id"), nullable=False),
+            sa.Column("file_url", sa.String(), nullable=False),
+            sa.Column("media_type", enum("media_type"), nullable=False),
+            sa.Column("file_metadata", postgresql.JSONB(), nullable=True),
+            sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=UTC_NOW, nullable=False),
+        )
+
+    if "verifications" not in existing:
+        op.create_table(
+            "verifications",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("report_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("reports.id"), nullable=False),
+            sa.Column("source", enum("verification_source"), nullable=False),
+            sa.Column("result_data", postgresql.JSONB(), nullable=False),
+            sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=UTC_NOW, nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table("verifications")
+    op.drop_table("media")
+    op.drop_table("reports")
+    op.drop_table("users")
+    for name in reversed(list(ENUMS)):
+        op.execute(f"DROP TYPE IF EXISTS {name}")
@@ -0,0 +1,81 @@
+"""Report change tracking, media dedup, resumable uploads and token revocation
+
+Columns and tables added to the models since the baseline. Each is skipped if a
+database created with create_all already has it. Indexes on the existing large
+tables are built concurrently in 0003.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+UTC_NOW = sa.text("TIMEZONE('utc', now())")
+
+
+def media_type():
+    return postgresql.ENUM("image", "video", "audio", name="media_type", create_type=False)
+
+
+def upgrade():
+    # now() is stable, so Postgres stores the default once instead of rewriting the table
+    op.execute(
+        "ALTER TABLE reports ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE "
+        "NOT NULL DEFAULT TIMEZONE('utc', now())"
+    )
+    op.execute("ALTER TABLE media ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)")
+
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "media_blobs" not in existing:
+        op.create_table(
+            "media_blobs",
+            sa.Column("content_hash", sa.String(64), primary_key=True),
+            sa.Column("s3_key", sa.String(), nullable=False, unique=True),
+            sa.Column("file_url", sa.String(), nullable=False),
+            sa.Column("media_type", media_type(), nullable=False),
+            sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+            sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=UTC_NOW, nullable=False),
+        )
+
+    if "upload_sessions" not in existing:
+        op.create_table(
+            "upload_sessions",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("report_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("s3_key", sa.String(), nullable=False),
+            sa.Column("s3_upload_id", sa.String(), nullable=False),
+            sa.Column("content_type", sa.String(), nullable=False),
+            sa.Column("media_type", media_type(), nullable=False),
+            sa.Column("length", sa.BigInteger(), nullable=False),
+            sa.Column("offset", sa.BigInteger(), nullable=False),
+            sa.Column("parts", postgresql.JSONB(), nullable=False),
+            sa.Column("completed", sa.Boolean(), nullable=False),
+            sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=UTC_NOW, nullable=False),
+            sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        )
+
+    if "revoked_tokens" not in existing:
+        op.create_table(
+            "revoked_tokens",
+            sa.Column("id", sa.String(64), primary_key=True),
+            sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False),
+            sa.Column("revoked_at", sa.TIMESTAMP(timezone=True), server_default=UTC_NOW, nullable=False),
+        )
+        op.create_index("ix_revoked_tokens_revoked_at", "revoked_tokens", ["revoked_at"])
+
+
+def downgrade():
+    op.drop_table("revoked_tokens")
+    op.drop_table("upload_sessions")
+    op.drop_table("media_blobs")
+    op.execute("ALTER TABLE media DROP COLUMN IF EXISTS content_hash")
+    op.execute("ALTER TABLE reports DROP COLUMN IF EXISTS updated_at")
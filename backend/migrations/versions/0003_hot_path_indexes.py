@@ -0,0 +1,84 @@
+"""Hot-path indexes, built concurrently
+
+Indexes behind confidence scoring (verifications by report), the thumbnail lookup,
+/recent, /hotspots and the delta feed. They are built with CREATE INDEX
+CONCURRENTLY, outside a transaction, so report intake keeps writing while they
+build. An interrupted build leaves an INVALID index behind; it is dropped and
+rebuilt on the next run.
+
+The geography GIST index from the baseline is replaced by one on the geometry
+cast the viewport and tile queries use (app.db.models.report_point): the new
+index is built under a temporary name, then swapped in.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_verifications_report_id": "verifications (report_id)",
+    "ix_media_report_id_created_at": "media (report_id, created_at)",
+    "ix_media_content_hash": "media (content_hash)",
+    "ix_reports_status": "reports (status)",
+    "ix_reports_created_at_id": "reports (created_at, id)",
+    "ix_reports_created_at_brin": "reports USING brin (created_at)",
+    "ix_reports_updated_at_id": "reports (updated_at, id)",
+    "ix_reports_hotspot_status_confidence": (
+        "reports (status, final_confidence_score) "
+        # HOTSPOT_CONFIDENCE_THRESHOLD at the time of this migration
+        "WHERE final_confidence_score >= 0.35"
+    ),
+}
+
+LOCATION_INDEX = "idx_reports_user_location"
+LOCATION_INDEX_DEFINITION = "reports USING gist ((user_location::geometry(POINT,4326)))"
+
+
+def _index_state(name):
+    """(exists, valid, definition) of an index in the current schema."""
+    row = op.get_bind().execute(
+        sa.text(
+            "SELECT i.indisvalid, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND c.relnamespace = current_schema()::regnamespace"
+        ),
+        {"name": name},
+    ).first()
+    if row is None:
+        return False, False, None
+    return True, row[0], row[1]
+
+
+def _create_concurrently(name, definition):
+    exists, valid, _ = _index_state(name)
+    if exists and not valid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            _create_concurrently(name, definition)
+
+        exists, valid, definition = _index_state(LOCATION_INDEX)
+        if not exists or not valid or "geometry" not in definition:
+            temporary = f"{LOCATION_INDEX}_new"
+            _create_concurrently(temporary, LOCATION_INDEX_DEFINITION)
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {LOCATION_INDEX}")
+            op.execute(f"ALTER INDEX {temporary} RENAME TO {LOCATION_INDEX}")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {LOCATION_INDEX}")
+        op.execute(f"CREATE INDEX CONCURRENTLY {LOCATION_INDEX} ON reports USING gist (user_location)")
@@ -0,0 +1,140 @@
+"""Partition reports, media and verifications by month
+
+Recreates the three tables as range-partitioned tables, one partition per month of
+the report's created_at: media and verifications are partitioned on a new
+report_created_at column, so a report and everything attached to it share a month
+and a whole month can be detached at once. Primary keys become (id, created_at) /
+(id, report_created_at) and the foreign keys reference (id, created_at), as
+Postgres requires the partition key in every unique constraint.
+
+Partitions are created from the oldest report's month to PREMAKE_MONTHS ahead;
+partition_maintenance.py keeps creating them from then on.
+
+The data is copied into the new tables, so this takes the tables offline while it
+runs: run it in a maintenance window, with the API and workers stopped.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+PREMAKE_MONTHS = 3
+
+# table -> partition key
+TABLES = {
+    "reports": "created_at",
+    "media": "report_created_at",
+    "verifications": "report_created_at",
+}
+
+INDEXES = {
+    "idx_reports_user_location": "reports USING gist ((user_location::geometry(POINT,4326)))",
+    "ix_reports_updated_at_id": "reports (updated_at, id)",
+    "ix_reports_created_at_id": "reports (created_at, id)",
+    "ix_reports_created_at_brin": "reports USING brin (created_at)",
+    "ix_reports_status": "reports (status)",
+    "ix_reports_hotspot_status_confidence": (
+        "reports (status, final_confidence_score) WHERE final_confidence_score >= 0.35"
+    ),
+    "ix_media_report_id_created_at": "media (report_id, created_at)",
+    "ix_media_content_hash": "media (content_hash)",
+    "ix_verifications_report_id": "verifications (report_id)",
+}
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _months():
+    """First day of every month that needs a partition."""
+    oldest, newest = op.get_bind().execute(sa.text("SELECT min(created_at), max(created_at) FROM reports")).one()
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    month = oldest.astimezone(timezone.utc).date().replace(day=1) if oldest else this_month
+    last = _add_months(this_month, PREMAKE_MONTHS)
+    if newest:
+        last = max(last, newest.astimezone(timezone.utc).date().replace(day=1))
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+
+def _columns(table):
+    return ", ".join(f'"{column["name"]}"' for column in sa.inspect(op.get_bind()).get_columns(table))
+
+
+def _add_constraints_and_indexes(partitioned):
+    report_key = "(id, created_at)" if partitioned else "(id)"
+    child_key = "(id, report_created_at)" if partitioned else "(id)"
+    child_fk = "(report_id, report_created_at)" if partitioned else "(report_id)"
+
+    op.execute(f"ALTER TABLE reports ADD CONSTRAINT reports_pkey PRIMARY KEY {report_key}")
+    op.execute("ALTER TABLE reports ADD CONSTRAINT reports_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)")
+    for child in ("media", "verifications"):
+        fk_name = f"fk_{child}_report" if partitioned else f"{child}_report_id_fkey"
+        op.execute(f"ALTER TABLE {child} ADD CONSTRAINT {child}_pkey PRIMARY KEY {child_key}")
+        op.execute(
+            f"ALTER TABLE {child} ADD CONSTRAINT {fk_name} FOREIGN KEY {child_fk} REFERENCES reports {report_key}"
+        )
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON {definition}")
+
+
+def upgrade():
+    op.execute("LOCK TABLE reports, media, verifications IN ACCESS EXCLUSIVE MODE")
+
+    op.execute(
+        "CREATE TABLE reports_partitioned (LIKE reports INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"
+    )
+    for child in ("media", "verifications"):
+        op.execute(
+            f"CREATE TABLE {child}_partitioned (LIKE {child} INCLUDING DEFAULTS, "
+            "report_created_at TIMESTAMP WITH TIME ZONE NOT NULL) PARTITION BY RANGE (report_created_at)"
+        )
+
+    for month in _months():
+        upper = _add_months(month, 1)
+        for table in TABLES:
+            op.execute(
+                f"CREATE TABLE {table}_y{month.year}m{month.month:02d} PARTITION OF {table}_partitioned "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+            )
+
+    op.execute("INSERT INTO reports_partitioned SELECT * FROM reports")
+    for child in ("media", "verifications"):
+        op.execute(
+            f"INSERT INTO {child}_partitioned SELECT c.*, r.created_at FROM {child} c "
+            "JOIN reports r ON r.id = c.report_id"
+        )
+
+    op.execute("DROP TABLE verifications, media, reports")
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table}_partitioned RENAME TO {table}")
+    _add_constraints_and_indexes(partitioned=True)
+
+
+def downgrade():
+    op.execute("LOCK TABLE reports, media, verifications IN ACCESS EXCLUSIVE MODE")
+
+    for table in TABLES:
+        op.execute(f"CREATE TABLE {table}_plain (LIKE {table} INCLUDING DEFAULTS)")
+    for child in ("media", "verifications"):
+        op.execute(f"ALTER TABLE {child}_plain DROP COLUMN report_created_at")
+    for table in TABLES:
+        columns = _columns(f"{table}_plain")
+        op.execute(f"INSERT INTO {table}_plain ({columns}) SELECT {columns} FROM {table}")
+
+    op.execute("DROP TABLE verifications, media, reports")
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table}_plain RENAME TO {table}")
+    _add_constraints_and_indexes(partitioned=False)
@@ -0,0 +1,99 @@
+"""Running confidence aggregates on reports
+
+Adds the columns VerificationTracker updates in the same statement as each
+verification insert: confidence_weighted_sum (sum of score * weight),
+confidence_weight (sum of weight), and bitmasks of the sources that have reported
+and of those that reported an error. Adding them with constant defaults does not
+rewrite the tables.
+
+Existing reports are backfilled from their verifications. The scores below are the
+ConfidenceCalculator rules at the time of this revision, in SQL.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+COLUMNS = {
+    "confidence_weighted_sum": "DOUBLE PRECISION",
+    "confidence_weight": "DOUBLE PRECISION",
+    "verification_sources": "INTEGER",
+    "verification_error_sources": "INTEGER",
+}
+
+# Matches VERIFICATION_SOURCE_BITS in app/db/models.py
+SOURCE_BIT = """
+    CASE source
+        WHEN 'nlp_pipeline' THEN 1
+        WHEN 'weather_api' THEN 2
+        WHEN 'peer_report' THEN 4
+        ELSE 0
+    END
+"""
+
+WEIGHT = """
+    CASE source
+        WHEN 'weather_api' THEN 0.4
+        WHEN 'nlp_pipeline' THEN 0.4
+        WHEN 'peer_report' THEN 0.2
+        ELSE 0.0
+    END
+"""
+
+SCORE = """
+    CASE
+        WHEN result_data ? 'error' THEN 0.0
+        WHEN source = 'weather_api' THEN
+            CASE result_data->>'match_status' WHEN 'confirmed' THEN 0.8 WHEN 'unconfirmed' THEN 0.2 ELSE 0.5 END
+        WHEN source = 'nlp_pipeline' THEN (
+            CASE COALESCE(result_data->>'urgency', 'Medium')
+                WHEN 'Low' THEN 0.3 WHEN 'Medium' THEN 0.5 WHEN 'High' THEN 0.7 WHEN 'Critical' THEN 0.9 ELSE 0.5
+            END
+            + CASE
+                WHEN NOT result_data ? 'sentiment' THEN 0.6
+                ELSE CASE result_data->>'sentiment'
+                    WHEN 'Calm' THEN 0.3 WHEN 'Informative' THEN 0.6 WHEN 'Worried' THEN 0.8 WHEN 'Panicked' THEN 0.9 ELSE 0.5
+                END
+            END
+        ) / 2
+        ELSE 0.5
+    END
+"""
+
+
+def upgrade():
+    for name, column_type in COLUMNS.items():
+        op.execute(f"ALTER TABLE reports ADD COLUMN IF NOT EXISTS {name} {column_type} NOT NULL DEFAULT 0")
+
+    op.execute(
+        f"""
+        UPDATE reports
+        SET confidence_weighted_sum = aggregates.weighted_sum,
+            confidence_weight = aggregates.weight,
+            verification_sources = aggregates.sources,
+            verification_error_sources = aggregates.error_sources
+        FROM (
+            SELECT
+                report_id,
+                report_created_at,
+                SUM(({SCORE}) * ({WEIGHT})) AS weighted_sum,
+                SUM({WEIGHT}) AS weight,
+                BIT_OR({SOURCE_BIT}) AS sources,
+                BIT_OR(CASE WHEN result_data ? 'error' THEN {SOURCE_BIT} ELSE 0 END) AS error_sources
+            FROM verifications
+            GROUP BY report_id, report_created_at
+        ) AS aggregates
+        WHERE reports.id = aggregates.report_id AND reports.created_at = aggregates.report_created_at
+        """
+    )
+
+
+def downgrade():
+    for name in COLUMNS:
+        op.execute(f"ALTER TABLE reports DROP COLUMN IF EXISTS {name}")
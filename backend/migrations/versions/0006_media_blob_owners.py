@@ -0,0 +1,46 @@
+"""Media blob owners
+
+Records which users uploaded each stored blob, so media can only be attached by
+hash or key by someone who has uploaded it. Existing owners are taken from the
+reports that already use each blob; blobs registered but not yet attached to a
+report get no owner, and their uploader has to send the bytes again.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+UTC_NOW = sa.text("TIMEZONE('utc', now())")
+
+
+def upgrade():
+    if "media_blob_owners" not in set(sa.inspect(op.get_bind()).get_table_names()):
+        op.create_table(
+            "media_blob_owners",
+            sa.Column("content_hash", sa.String(64), sa.ForeignKey("media_blobs.content_hash"), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=UTC_NOW, nullable=False),
+        )
+
+    op.execute(
+        """
+        INSERT INTO media_blob_owners (content_hash, user_id)
+        SELECT DISTINCT media.content_hash, reports.user_id
+        FROM media
+        JOIN reports ON reports.id = media.report_id AND reports.created_at = media.report_created_at
+        JOIN media_blobs ON media_blobs.content_hash = media.content_hash
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("media_blob_owners")
@@ -0,0 +1,29 @@
+"""Upload chunk claims
+
+Lets the resumable upload handler claim an offset in one short transaction and
+record the stored part in another, instead of holding the session row locked
+while the chunk is sent to S3.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE upload_sessions ADD COLUMN IF NOT EXISTS chunk_claim_id UUID")
+    op.execute("ALTER TABLE upload_sessions ADD COLUMN IF NOT EXISTS chunk_claimed_until TIMESTAMP WITH TIME ZONE")
+    # The cleanup job looks sessions up by expiry
+    op.execute("CREATE INDEX IF NOT EXISTS ix_upload_sessions_expires_at ON upload_sessions (expires_at)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_upload_sessions_expires_at")
+    op.execute("ALTER TABLE upload_sessions DROP COLUMN IF EXISTS chunk_claimed_until")
+    op.execute("ALTER TABLE upload_sessions DROP COLUMN IF EXISTS chunk_claim_id")
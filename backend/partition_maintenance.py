@@ -0,0 +1,121 @@
+"""
+Partition maintenance for reports, media and verifications.
+
+Each table has one partition per month of the report's created_at, named
+<table>_y<year>m<month>. Run this daily (cron, Kubernetes CronJob, ...):
+
+- creates the partitions for the next PARTITION_PREMAKE_MONTHS months, so inserts
+  never hit a month without a partition;
+- with REPORT_RETENTION_MONTHS set, detaches the months older than that and moves
+  them into the PARTITION_ARCHIVE_SCHEMA schema (or drops them with --drop).
+
+Detaching uses DETACH PARTITION ... CONCURRENTLY (Postgres 14+), so the API keeps
+reading and writing while it runs. A detach that was interrupted is finalized on
+the next run.
+
+    python partition_maintenance.py [--dry-run] [--drop]
+"""
+import argparse
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+# Parent first for creation; children first for detaching, so no attached row
+# ever references a detached report
+TABLES = ("reports", "media", "verifications")
+PARTITION_NAME = re.compile(r"^(?P<table>\w+)_y(?P<year>\d{4})m(?P<month>\d{2})$")
+# Creating a partition briefly locks the parent; give up rather than queue behind long queries
+LOCK_TIMEOUT = "5s"
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def attached_partitions(conn, table: str) -> dict:
+    """Month -> (name, detach_pending) of the table's partitions."""
+    rows = conn.execute(text(
+        "SELECT c.relname, i.inhdetachpending FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:table AS regclass)"
+    ), {"table": table}).all()
+    partitions = {}
+    for name, pending in rows:
+        match = PARTITION_NAME.match(name)
+        if match and match["table"] == table:
+            partitions[date(int(match["year"]), int(match["month"]), 1)] = (name, pending)
+    return partitions
+
+
+def run(conn, statement: str, dry_run: bool):
+    print(f"[PartitionMaintenance] {statement}")
+    if not dry_run:
+        conn.execute(text(statement))
+
+
+def create_future_partitions(conn, dry_run: bool):
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    for table in TABLES:
+        existing = attached_partitions(conn, table)
+        for offset in range(settings.PARTITION_PREMAKE_MONTHS + 1):
+            month = add_months(this_month, offset)
+            if month in existing:
+                continue
+            run(conn, (
+                f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+            ), dry_run)
+
+
+def detach_expired_partitions(conn, drop: bool, dry_run: bool):
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    cutoff = add_months(this_month, -settings.REPORT_RETENTION_MONTHS)
+    schema = settings.PARTITION_ARCHIVE_SCHEMA
+    if not drop:
+        run(conn, f"CREATE SCHEMA IF NOT EXISTS {schema}", dry_run)
+
+    for table in reversed(TABLES):
+        for month, (name, pending) in sorted(attached_partitions(conn, table).items()):
+            if month >= cutoff:
+                continue
+            if pending:
+                run(conn, f"ALTER TABLE {table} DETACH PARTITION {name} FINALIZE", dry_run)
+            else:
+                run(conn, f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY", dry_run)
+            if table != "reports":
+                # A detached partition keeps its foreign key, which would pin the report rows
+                run(conn, f"ALTER TABLE {name} DROP CONSTRAINT IF EXISTS fk_{table}_report", dry_run)
+            if drop:
+                run(conn, f"DROP TABLE {name}", dry_run)
+            else:
+                run(conn, f"ALTER TABLE {name} SET SCHEMA {schema}", dry_run)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create upcoming report partitions and detach expired ones.")
+    parser.add_argument("--dry-run", action="store_true", help="Print the statements without running them")
+    parser.add_argument("--drop", action="store_true", help="Drop expired partitions instead of archiving them")
+    args = parser.parse_args()
+
+    # DETACH ... CONCURRENTLY cannot run inside a transaction block
+    engine = create_engine(settings.SYNC_DATABASE_URL, isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        conn.execute(text(f"SET lock_timeout = '{LOCK_TIMEOUT}'"))
+        create_future_partitions(conn, args.dry_run)
+        if settings.REPORT_RETENTION_MONTHS is not None:
+            detach_expired_partitions(conn, args.drop, args.dry_run)
+    engine.dispose()
+    print("[PartitionMaintenance] Done.")
+
+
+if __name__ == "__main__":
+    main()
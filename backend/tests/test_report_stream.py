@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.dependencies import parse_bbox
+from app.services.report_stream import ReportStreamService
+
+EVENT = {"type": "report_created", "report_id": "r1", "latitude": 10.5, "longitude": 20.5, "hazard_type": "Tsunami"}
+
+
+def test_full_unindexed_subscriber_is_dropped_without_stopping_fanout():
+    stream = ReportStreamService(max_subscribers=10, queue_size=1)
+    slow = stream.subscribe(None, set())
+    others = [stream.subscribe(None, set()) for _ in range(3)]
+    slow.queue.put_nowait(b"backlog")
+
+    asyncio.run(stream.on_report_event(EVENT))
+
+    assert slow.closed
+    assert slow not in stream.unindexed
+    assert stream.subscriber_count == 3
+    for subscription in others:
+        assert not subscription.closed
+        assert subscription.queue.qsize() == 1
+
+
+def test_full_cell_subscriber_is_dropped():
+    stream = ReportStreamService(max_subscribers=10, queue_size=1)
+    slow = stream.subscribe((10.0, 20.0, 11.0, 21.0), set())
+    other = stream.subscribe((10.0, 20.0, 11.0, 21.0), set())
+    slow.queue.put_nowait(b"backlog")
+
+    asyncio.run(stream.on_report_event(EVENT))
+
+    assert slow.closed
+    assert other.queue.qsize() == 1
+    assert all(slow not in members for members in stream.cells.values())
+
+
+@pytest.mark.parametrize("bbox", ["nan,10,21,11", "20,10,inf,11", "-inf,-inf,inf,inf"])
+def test_non_finite_bbox_is_rejected(bbox):
+    with pytest.raises(HTTPException) as error:
+        parse_bbox(bbox)
+    assert error.value.status_code == 400
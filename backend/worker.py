@@ -1,93 +1,284 @@
 import asyncio
 import json
 import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
 from aio_pika.abc import AbstractIncomingMessage
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
 
-from app.db.session import get_db
-from app.db.models import Report, Media, HazardType, MediaType, User
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.db.models import Report, Media, HazardType, MediaType, ReportStatus
 from app.services.rabbitmq_service import rabbitmq_service
+from app.services.report_events import report_events
+from app.services.admission_control import REPORT_QUEUE, LOW_PRIORITY_REPORT_QUEUE
 
-async def process_report_message(message: AbstractIncomingMessage):
+LOW_PRIORITY_POLL_SECONDS = 1.0
+
+def parse_report_message(message: AbstractIncomingMessage) -> Dict:
+    """Decode a report_processing_queue message into the fields the batch needs."""
+    body = json.loads(message.body.decode())
+    report_data = body["report_data"]
+    submitted_at = body.get("submitted_at")
+    return {
+        "message": message,
+        "id": uuid.UUID(body["report_id"]),
+        "user_id": uuid.UUID(body["user_id"]),
+        # Messages queued before submitted_at existed are stamped on arrival
+        "created_at": datetime.fromisoformat(submitted_at) if submitted_at else datetime.now(timezone.utc),
+        "hazard_type": HazardType(report_data["user_hazard_type"]),
+        "report_data": report_data,
+        "media_files": body["media_files"],
+    }
+
+async def save_report_batch(reports: List[Dict]) -> List[Dict]:
     """
-    Callback function to process a message from the report_processing_queue.
-    This worker's main jobs are:
-    1. Save the initial report and media file records to the database.
-    2. Dispatch new, specialized tasks to the verification queues (fan-out).
+    Inserts the reports and their media with one multi-row INSERT each, in a single
+    transaction. Reports are keyed by (id, created_at) and created_at is the API's
+    submission time, so a redelivered message conflicts with the row it already
+    wrote and ON CONFLICT DO NOTHING skips it; ids already saved by an earlier
+    message (a re-sent report) are skipped up front.
+    Returns the reports whose verification tasks must be dispatched: the ones just
+    inserted, plus redeliveries of saved ones, whose first delivery may have failed
+    before dispatching.
     """
-    async with message.process():
-        try:
-            body = json.loads(message.body.decode())
-            report_id = uuid.UUID(body["report_id"])
-            user_id = uuid.UUID(body["user_id"])
-            report_data = body["report_data"]
-            media_files_data = body["media_files"]
-
-            print(f"[+] Received initial report {report_id}. Saving to DB and dispatching.")
-
-            async for db in get_db():
-                new_report = Report(
-                    id=report_id,
-                    user_id=user_id,
-                    user_hazard_type=HazardType(report_data["user_hazard_type"]),
-                    user_description=report_data["user_description"],
-                    user_location=f'SRID=4326;POINT({report_data["longitude"]} {report_data["latitude"]})'
-                )
-                db.add(new_report)
-
-                for media_data in media_files_data:
-                    new_media = Media(
-                        report_id=report_id,
-                        file_url=media_data["file_url"],
-                        media_type=MediaType(media_data["media_type"]),
-                    )
-                    db.add(new_media)
+    async with AsyncSessionLocal() as db:
+        existing = set((await db.execute(
+            select(Report.id).where(Report.id.in_([report["id"] for report in reports]))
+        )).scalars().all())
+
+        inserted: Set[uuid.UUID] = set()
+        new_reports = [report for report in reports if report["id"] not in existing]
+        if new_reports:
+            result = await db.execute(
+                insert(Report)
+                .values([
+                    {
+                        "id": report["id"],
+                        "user_id": report["user_id"],
+                        "user_hazard_type": report["hazard_type"],
+                        "user_description": report["report_data"]["user_description"],
+                        "user_location": (
+                            f'SRID=4326;POINT({report["report_data"]["longitude"]} {report["report_data"]["latitude"]})'
+                        ),
+                        "status": ReportStatus.under_verification,
+                        "final_confidence_score": 0.0,
+                        "created_at": report["created_at"],
+                    }
+                    for report in new_reports
+                ])
+                .on_conflict_do_nothing()
+                .returning(Report.id)
+            )
+            inserted = set(result.scalars().all())
 
-                await db.commit()
-                print(f"  - Successfully saved report {report_id} and {len(media_files_data)} media file(s) to the database.")
+            media_rows = [
+                {
+                    "id": uuid.uuid4(),
+                    "report_id": report["id"],
+                    "report_created_at": report["created_at"],
+                    "file_url": media_data["file_url"],
+                    "media_type": MediaType(media_data["media_type"]),
+                    "content_hash": media_data.get("content_hash"),
+                }
+                for report in new_reports if report["id"] in inserted
+                for media_data in report["media_files"]
+            ]
+            if media_rows:
+                await db.execute(insert(Media).values(media_rows))
+        await db.commit()
 
-            nlp_message = {
-                "report_id": str(report_id),
-                "user_description": report_data["user_description"],
-                "media_files": media_files_data,
+    return [
+        report for report in reports
+        if report["id"] in inserted or (report["id"] in existing and report["message"].redelivered)
+    ]
+
+async def dispatch_reports(reports: List[Dict]) -> Set[uuid.UUID]:
+    """
+    Announces saved reports and fans their tasks out to the verification queues,
+    all publishes in flight together. Returns the ids of reports whose tasks could
+    not all be queued.
+    """
+    await asyncio.gather(*(
+        report_events.publish(
+            "report_created",
+            report["id"],
+            report["report_data"]["latitude"],
+            report["report_data"]["longitude"],
+            hazard_type=report["report_data"]["user_hazard_type"],
+            status=ReportStatus.under_verification.value,
+            confidence=0.0
+        )
+        for report in reports
+    ))
+
+    tasks = {
+        "nlp_queue": [
+            {
+                "report_id": str(report["id"]),
+                "user_description": report["report_data"]["user_description"],
+                "media_files": report["media_files"],
             }
-            await rabbitmq_service.publish_message("nlp_queue", nlp_message)
-            print(f"  - Dispatched task to nlp_queue for report {report_id}")
-
-            weather_message = {
-                "report_id": str(report_id),
-                "latitude": report_data["latitude"],
-                "longitude": report_data["longitude"],
-                "user_hazard_type": report_data["user_hazard_type"]
+            for report in reports
+        ],
+        "weather_queue": [
+            {
+                "report_id": str(report["id"]),
+                "latitude": report["report_data"]["latitude"],
+                "longitude": report["report_data"]["longitude"],
+                "user_hazard_type": report["report_data"]["user_hazard_type"]
             }
-            await rabbitmq_service.publish_message("weather_queue", weather_message)
-            print(f"  - Dispatched task to weather_queue for report {report_id}")
-
-            peer_message = {
-                "report_id": str(report_id),
-                "latitude": report_data["latitude"],
-                "longitude": report_data["longitude"],
-                "hazard_type": report_data["user_hazard_type"],
+            for report in reports
+        ],
+        "peer_notification_queue": [
+            {
+                "report_id": str(report["id"]),
+                "latitude": report["report_data"]["latitude"],
+                "longitude": report["report_data"]["longitude"],
+                "hazard_type": report["report_data"]["user_hazard_type"],
             }
-            await rabbitmq_service.publish_message("peer_notification_queue", peer_message)
-            print(f"  - Dispatched task to peer_notification_queue for report {report_id}")
+            for report in reports
+        ],
+    }
+    results = await asyncio.gather(
+        *(rabbitmq_service.publish_messages(queue, bodies) for queue, bodies in tasks.items()),
+        return_exceptions=True
+    )
+
+    failed: Set[uuid.UUID] = set()
+    for queue, errors in zip(tasks, results):
+        if isinstance(errors, BaseException):
+            errors = [errors] * len(reports)
+        for report, error in zip(reports, errors):
+            if error is not None:
+                print(f"[!] Could not dispatch report {report['id']} to {queue}: {error}")
+                failed.add(report["id"])
+    return failed
+
+async def process_report_batch(messages: List[AbstractIncomingMessage]):
+    """
+    Processes a batch of report_processing_queue messages:
+    1. Save the reports and media records to the database in one transaction.
+    2. Dispatch new, specialized tasks to the verification queues (fan-out).
+    3. Ack the batch. Reports whose tasks could not be queued are requeued, and
+       their redelivery dispatches them again.
+    A batch the database rejects is retried one report at a time, so a single bad
+    report does not hold back the others.
+    """
+    reports: List[Dict] = []
+    seen: Set[uuid.UUID] = set()
+    for message in messages:
+        try:
+            report = parse_report_message(message)
+        except Exception as e:
+            print(f"[!] Dropping malformed report message: {e}")
+            await message.ack()
+            continue
+        if report["id"] in seen:
+            # Same report twice in one batch: the first copy covers it
+            await message.ack()
+            continue
+        seen.add(report["id"])
+        reports.append(report)
+    if not reports:
+        return
+
+    try:
+        to_dispatch = await save_report_batch(reports)
+    except Exception as e:
+        print(f"[!] Error saving batch of {len(reports)} reports, retrying one at a time: {e}")
+        to_dispatch = []
+        for report in reports:
+            try:
+                to_dispatch += await save_report_batch([report])
+            except Exception as e:
+                print(f"[!] Error saving report {report['id']}: {e}")
 
-            print(f"[✔] Finished processing and dispatching for report {report_id}.")
+    failed = await dispatch_reports(to_dispatch) if to_dispatch else set()
+
+    await asyncio.gather(*(
+        report["message"].nack(requeue=True) if report["id"] in failed else report["message"].ack()
+        for report in reports
+    ))
+    print(f"[✔] Processed batch of {len(reports)} reports: {len(to_dispatch) - len(failed)} dispatched, "
+          f"{len(reports) - len(to_dispatch)} already saved or failed, {len(failed)} requeued.")
+
+class ReportBatcher:
+    """
+    Collects consumed messages into batches of up to COORDINATOR_BATCH_SIZE, waiting
+    at most COORDINATOR_BATCH_MAX_WAIT_MS after the first message of a batch, and
+    processes one batch at a time.
+    """
 
+    def __init__(self, batch_size: int, max_wait_seconds: float):
+        self.batch_size = batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.pending: "asyncio.Queue[AbstractIncomingMessage]" = asyncio.Queue()
+
+    async def add(self, message: AbstractIncomingMessage):
+        """Consumer callback: queue the message for the next batch."""
+        await self.pending.put(message)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.pending.get()]
+            deadline = loop.time() + self.max_wait_seconds
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.pending.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await process_report_batch(batch)
+            except Exception as e:
+                print(f"[!] Error processing batch: {e}")
+
+async def drain_low_priority_reports():
+    """
+    Processes reports accepted while the system was overloaded, a batch at a time and
+    only while report_processing_queue has nothing waiting, so they never delay
+    normal reports.
+    """
+    while True:
+        try:
+            if await rabbitmq_service.queue_depth(REPORT_QUEUE) == 0:
+                batch: List[AbstractIncomingMessage] = []
+                while len(batch) < settings.COORDINATOR_BATCH_SIZE:
+                    message: Optional[AbstractIncomingMessage] = await rabbitmq_service.get_message(
+                        LOW_PRIORITY_REPORT_QUEUE
+                    )
+                    if message is None:
+                        break
+                    batch.append(message)
+                if batch:
+                    await process_report_batch(batch)
+                    continue
         except Exception as e:
-            print(f"[!] Error processing message: {e}")
+            print(f"[!] Error draining low-priority reports: {e}")
+        await asyncio.sleep(LOW_PRIORITY_POLL_SECONDS)
 
 async def main():
     """Main function to connect to RabbitMQ and start the worker."""
     print("Starting Coordinator Worker...")
-    await rabbitmq_service.connect()
-    await rabbitmq_service.consume_messages("report_processing_queue", process_report_message)
+    await rabbitmq_service.connect(prefetch_count=settings.COORDINATOR_PREFETCH)
+    batcher = ReportBatcher(settings.COORDINATOR_BATCH_SIZE, settings.COORDINATOR_BATCH_MAX_WAIT_MS / 1000)
+    batcher_task = asyncio.create_task(batcher.run())
+    await rabbitmq_service.consume_messages(REPORT_QUEUE, batcher.add)
+    low_priority_task = asyncio.create_task(drain_low_priority_reports())
 
     print("[*] Coordinator worker is running and waiting for reports...")
     try:
         await asyncio.Future()
     finally:
+        low_priority_task.cancel()
+        batcher_task.cancel()
         await rabbitmq_service.close()
         print("Coordinator worker shut down.")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -6,6 +6,7 @@ import '../models/user_model.dart';
 
 class AuthService {
   static const String _tokenKey = 'auth_token';
+  static const String _refreshTokenKey = 'refresh_token';
   static const String _userKey = 'user_data';
 
   // Singleton pattern
@@ -74,7 +75,7 @@ class AuthService {
           isVerified: true,
         );
 
-        await _storeAuthData(token, user);
+        await _storeAuthData(token, user, refreshToken: data['refresh_token']);
         return user;
       } else {
         String message = 'Login failed';
@@ -171,15 +172,15 @@ class AuthService {
   Future<String?> refreshToken() async {
     try {
       final prefs = await SharedPreferences.getInstance();
-      final currentToken = prefs.getString(_tokenKey);
+      final refreshToken = prefs.getString(_refreshTokenKey);
 
-      if (currentToken == null) return null;
+      if (refreshToken == null) return null;
 
       final response = await http.post(
         Uri.parse('${AppConstants.baseUrl}/api/auth/refresh'),
         headers: {
           'Content-Type': 'application/json',
-          'Authorization': 'Bearer $currentToken',
+          'Authorization': 'Bearer $refreshToken',
         },
       ).timeout(
         const Duration(milliseconds: AppConstants.apiTimeout),
@@ -187,10 +188,11 @@ class AuthService {
 
       if (response.statusCode == 200) {
         final data = json.decode(response.body);
-        final newToken = data['token'];
+        final newToken = data['access_token'];
         
-        // Update stored token
+        // Update stored tokens; each refresh token can only be used once
         await prefs.setString(_tokenKey, newToken);
+        await prefs.setString(_refreshTokenKey, data['refresh_token']);
         
         return newToken;
       } else {
@@ -212,9 +214,12 @@ class AuthService {
   }
 
   // Store authentication data
-  Future<void> _storeAuthData(String token, UserModel user) async {
+  Future<void> _storeAuthData(String token, UserModel user, {String? refreshToken}) async {
     final prefs = await SharedPreferences.getInstance();
     await prefs.setString(_tokenKey, token);
+    if (refreshToken != null) {
+      await prefs.setString(_refreshTokenKey, refreshToken);
+    }
     await prefs.setString(_userKey, json.encode(user.toJson()));
   }
 
@@ -222,6 +227,7 @@ class AuthService {
   Future<void> _clearAuthData() async {
     final prefs = await SharedPreferences.getInstance();
     await prefs.remove(_tokenKey);
+    await prefs.remove(_refreshTokenKey);
     await prefs.remove(_userKey);
   }
 
@@ -1,7 +1,8 @@
 import api from '../utils/api';
 
-export const fetchHotspots = async () => {
-  const { data } = await api.get('/reports/hotspots');
+// params: optional { min_lat, min_lng, max_lat, max_lng, limit } viewport filter
+export const fetchHotspots = async (params = {}) => {
+  const { data } = await api.get('/reports/hotspots', { params });
   // Normalize items
   return (data.items || []).map((h) => ({
     id: h.report_id,
@@ -31,4 +32,27 @@ export const fetchRecentReports = async (limit = 10) => {
     city: r.user_city || '',
     thumbnailUrl: r.thumbnail_url || null,
   }));
-};
\ No newline at end of file
+};
+// bbox: optional 'min_lng,min_lat,max_lng,max_lat' string for the visible map area
+export const fetchHotspotClusters = async (zoom, bbox) => {
+  const { data } = await api.get('/reports/hotspots/clusters', { params: { zoom, bbox } });
+  return (data.items || []).map((c) => ({
+    lat: c.latitude,
+    lng: c.longitude,
+    count: c.count,
+    maxConfidence: c.max_confidence,
+    avgConfidence: c.avg_confidence,
+    hazardType: c.dominant_hazard_type,
+  }));
+};
+
+// since: next_cursor from the previous call (omit for the initial sync)
+export const fetchHotspotChanges = async (since) => {
+  const { data } = await api.get('/reports/hotspots/changes', { params: { since } });
+  return {
+    items: data.items || [],
+    deleted: data.deleted || [],
+    nextCursor: data.next_cursor,
+    hasMore: Boolean(data.has_more),
+  };
+};